@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, Index
 from db.database import Base
 
 class Leave(Base):
     __tablename__ = "leaves"
+    __table_args__ = (
+        Index("ix_leaves_status_start", "status", "start_date"),
+        Index("ix_leaves_start_date", "start_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     employee_name = Column(String, index=True)
     start_date = Column(Date)
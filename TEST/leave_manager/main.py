@@ -1,4 +1,19 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from db.database import engine, Base
+from db import models  # registers tables on Base.metadata
 from routers import leaves
-app = FastAPI()
+from services.leave_service import LeaveService
+app = FastAPI(default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+async def startup():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    app.state.leave_service = LeaveService()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await engine.dispose()
+
 app.include_router(leaves.router, prefix="/leaves")
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import get_async_db
 from schemas.leave_schema import LeaveRequest, LeaveResponse
-from services.leave_service import LeaveService
 
 router = APIRouter()
-leave_service = LeaveService()
 
 @router.post("/", response_model=LeaveResponse)
-def apply_leave(leave: LeaveRequest):
-    return leave_service.create_leave(leave)
+async def apply_leave(leave: LeaveRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await request.app.state.leave_service.create_leave(leave, db)
 
-@router.get("/", response_model=list[LeaveResponse])
-def list_leaves():
-    return leave_service.get_all_leaves()
+# The body is streamed as a JSON array so the table is never loaded whole;
+# the declared model only documents the shape for OpenAPI.
+@router.get("/", responses={200: {"model": list[LeaveResponse]}})
+async def list_leaves(request: Request):
+    return StreamingResponse(request.app.state.leave_service.get_all_leaves(), media_type="application/json")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class LeaveRequest(BaseModel):
@@ -8,5 +8,7 @@ class LeaveRequest(BaseModel):
     reason: str
 
 class LeaveResponse(LeaveRequest):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     status: str
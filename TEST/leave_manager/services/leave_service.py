@@ -1,21 +1,43 @@
+from typing import AsyncIterator
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import SessionLocal
 from db.models import Leave
 from schemas.leave_schema import LeaveRequest, LeaveResponse
-from db.database import SessionLocal, engine, Base
 
-Base.metadata.create_all(bind=engine)
+# Rows fetched from the cursor (and encoded into one response chunk) at a time
+LEAVE_STREAM_BATCH = 1000
 
 class LeaveService:
-    def create_leave(self, leave: LeaveRequest) -> LeaveResponse:
-        db = SessionLocal()
-        new_leave = Leave(**leave.dict())
-        db.add(new_leave)
-        db.commit()
-        db.refresh(new_leave)
-        db.close()
-        return LeaveResponse(**new_leave.__dict__)
+    async def create_leave(self, leave: LeaveRequest, db: AsyncSession) -> LeaveResponse:
+        # RETURNING hands back the generated id and default status in the same round-trip,
+        # so no refresh SELECT is needed (SQLite >= 3.35)
+        result = await db.execute(insert(Leave).values(**leave.model_dump()).returning(Leave))
+        new_leave = result.scalar_one()
+        await db.commit()
+        return LeaveResponse.model_validate(new_leave, from_attributes=True)
 
-    def get_all_leaves(self) -> list[LeaveResponse]:
-        db = SessionLocal()
-        leaves = db.query(Leave).all()
-        db.close()
-        return [LeaveResponse(**leave.__dict__) for leave in leaves]
+    async def get_all_leaves(self) -> AsyncIterator[bytes]:
+        """
+        Streams every leave as a chunked JSON array, holding at most
+        LEAVE_STREAM_BATCH rows in memory at once.
+
+        The generator runs while the response is being sent, after request-scoped
+        dependencies have been cleaned up, so it opens its own session.
+        """
+        async with SessionLocal() as db:
+            result = await db.stream_scalars(
+                select(Leave).execution_options(yield_per=LEAVE_STREAM_BATCH)
+            )
+            separator = b"["
+            async for leaves in result.partitions():
+                # One orjson call per batch; model_dump(mode="json") already yields plain str/int values
+                payload = orjson.dumps([
+                    LeaveResponse.model_validate(leave, from_attributes=True).model_dump(mode="json", exclude_none=True)
+                    for leave in leaves
+                ])
+                yield separator + payload[1:-1]
+                separator = b","
+            # An empty table never reaches the loop body and still needs its opening bracket
+            yield b"[]" if separator == b"[" else b"]"
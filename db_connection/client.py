@@ -0,0 +1,169 @@
+# qdrant client factory
+import os
+from functools import lru_cache
+from typing import Iterator, List, Optional, Union
+import grpc
+from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+from utils.logger import LOGGER
+
+# Load environment variables from .env file
+load_dotenv()
+
+# --- Configuration ---
+QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
+QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333)) # Ensure port is an integer
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+# Set both to use Qdrant Cloud (or any remote instance) instead of QDRANT_HOST
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+QDRANT_TIMEOUT = 60
+# Connections the async client keeps open, i.e. how many requests can be in flight at once
+QDRANT_POOL_SIZE = 64
+# gRPC caps messages at 4 MB by default; a 256-point batch of 1536-d vectors plus payloads can exceed that
+QDRANT_GRPC_OPTIONS = {
+    "grpc.max_send_message_length": 64 << 20,
+    "grpc.max_receive_message_length": 64 << 20,
+}
+
+
+@lru_cache(maxsize=None)
+def get_qdrant_client(
+    host: str = QDRANT_HOST,
+    port: int = QDRANT_PORT,
+    grpc_port: int = QDRANT_GRPC_PORT,
+    pool_size: int = QDRANT_POOL_SIZE,
+    url: Optional[str] = QDRANT_URL,
+    api_key: Optional[str] = QDRANT_API_KEY,
+) -> QdrantClient:
+    """
+    Returns a process-wide Qdrant client for the given address, creating it on first use.
+
+    The client talks gRPC (protobuf over a single HTTP/2 channel) and is reused by every
+    caller, so connections (and, for a remote `url`, the TLS handshake) are set up once
+    instead of per manager or script. If the gRPC port cannot be reached, it falls back
+    to a REST client on `port`.
+
+    Args:
+        host (str): The host address of the Qdrant instance.
+        port (int): The REST port, used for the few calls gRPC does not cover.
+        grpc_port (int): The gRPC port of the Qdrant instance.
+        pool_size (int): The number of connections kept open for concurrent requests.
+        url (str, optional): Full address of a remote instance (e.g. Qdrant Cloud); replaces `host`.
+        api_key (str, optional): The API key for `url`.
+
+    Returns:
+        QdrantClient: The shared client instance.
+    """
+    address = _address_kwargs(host, url, api_key)
+    LOGGER.info(f"Creating Qdrant client for {url or host} (gRPC {grpc_port}, REST {port})...")
+    client = QdrantClient(
+        **address,
+        port=port,
+        grpc_port=grpc_port,
+        prefer_grpc=True,
+        timeout=QDRANT_TIMEOUT,
+        pool_size=pool_size,
+        grpc_options=QDRANT_GRPC_OPTIONS,
+    )
+    try:
+        client.get_collections()
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.UNAVAILABLE:
+            raise
+        LOGGER.warning(f"gRPC port {grpc_port} on {url or host} is unreachable ({e.details()}); falling back to REST on port {port}.")
+        client.close()
+        client = QdrantClient(
+            **address,
+            port=port,
+            timeout=QDRANT_TIMEOUT,
+            pool_size=pool_size,
+        )
+    return client
+
+
+def get_async_qdrant_client(
+    host: str = QDRANT_HOST,
+    port: int = QDRANT_PORT,
+    grpc_port: int = QDRANT_GRPC_PORT,
+    pool_size: int = QDRANT_POOL_SIZE,
+    url: Optional[str] = QDRANT_URL,
+    api_key: Optional[str] = QDRANT_API_KEY,
+) -> AsyncQdrantClient:
+    """
+    Creates an async Qdrant client for concurrent requests.
+
+    Not cached like get_qdrant_client: its channels belong to the event loop they are
+    first used on, so the caller keeps the instance for the lifetime of that loop.
+
+    Args:
+        host (str): The host address of the Qdrant instance.
+        port (int): The REST port of the Qdrant instance.
+        grpc_port (int): The gRPC port of the Qdrant instance.
+        pool_size (int): The number of connections kept open for concurrent requests.
+        url (str, optional): Full address of a remote instance (e.g. Qdrant Cloud); replaces `host`.
+        api_key (str, optional): The API key for `url`.
+
+    Returns:
+        AsyncQdrantClient: A new async client.
+    """
+    LOGGER.info(f"Creating async Qdrant client for {url or host} (gRPC {grpc_port}, pool size {pool_size})...")
+    return AsyncQdrantClient(
+        **_address_kwargs(host, url, api_key),
+        port=port,
+        grpc_port=grpc_port,
+        prefer_grpc=True,
+        timeout=QDRANT_TIMEOUT,
+        pool_size=pool_size,
+        grpc_options=QDRANT_GRPC_OPTIONS,
+    )
+
+
+def _address_kwargs(host: str, url: Optional[str], api_key: Optional[str]) -> dict:
+    """
+    Client arguments for the instance to connect to: `url` and `api_key` if a URL is set, else `host`.
+    """
+    if url:
+        return {"url": url, "api_key": api_key}
+    return {"host": host}
+
+
+def iter_points(
+    client: QdrantClient,
+    collection_name: str,
+    scroll_filter: Optional[models.Filter] = None,
+    batch_size: int = 256,
+    with_vectors: bool = False,
+    with_payload: Union[bool, List[str]] = True,
+) -> Iterator[models.Record]:
+    """
+    Lazily yields every point of a collection, following the scroll cursor page by page.
+
+    Only one page is held in memory at a time, so this works for collections of any size
+    without hitting the timeouts a single large-limit scroll runs into.
+
+    Args:
+        client (QdrantClient): The client to scroll with.
+        collection_name (str): The collection to read from.
+        scroll_filter (models.Filter, optional): Restricts which points are returned.
+        batch_size (int): Number of points fetched per scroll request.
+        with_vectors (bool): Whether to include the vectors in each point.
+        with_payload (Union[bool, List[str]]): Whether to include the payloads, or only
+                                               the listed payload fields (e.g. to skip 'content').
+
+    Yields:
+        models.Record: The points, with the requested payload.
+    """
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=with_vectors
+        )
+        yield from points
+        if offset is None:
+            break
@@ -1,52 +1,91 @@
 # qdrant_manager.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
 import os
 import uuid
-from typing import Any, List
-from typing_extensions import Dict
-from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from operator import attrgetter
+import numpy as np
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from qdrant_client.http.exceptions import UnexpectedResponse
+from db_connection.client import QDRANT_HOST, QDRANT_POOL_SIZE, QDRANT_PORT, get_async_qdrant_client, get_qdrant_client, iter_points
+from db_connection.query_cache import QueryCacheStore, QueryVectorCache, normalize
 from utils.logger import LOGGER
 
-# Load environment variables from .env file
-load_dotenv()
-
 # --- Configuration ---
-QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
-QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333)) # Ensure port is an integer
-COLLECTION_NAME = "codebase_chunks_v2" # Suitable collection name
+# v3: vectors are stored unit-normalized and compared with DOT; v2 (COSINE) must be re-ingested
+COLLECTION_NAME = "codebase_chunks_v3" # Suitable collection name
 # BGE-M3 embedding dimension
 EMBEDDING_DIMENSION = 1536
-DISTANCE_METRIC = models.Distance.COSINE
+# Dot product of unit vectors equals their cosine similarity, without the per-comparison norms
+DISTANCE_METRIC = models.Distance.DOT
+# Payload fields used in filters; without an index Qdrant falls back to a full scan
+PAYLOAD_INDEXES = {
+    "file_path": models.PayloadSchemaType.KEYWORD,
+    "import_dependencies": models.PayloadSchemaType.KEYWORD,
+}
+# Qdrant's default; restored after a bulk load, which turns indexing off (threshold 0)
+INDEXING_THRESHOLD = 20000
+# Searches run on the int8 vectors with 2x candidates, then rescore those with the full vectors
+SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+# Points per upsert request, and worker processes save_embeddings uploads with
+UPSERT_BATCH_SIZE = 256
+UPLOAD_PARALLELISM = max(1, (os.cpu_count() or 2) // 2)
+# Below this many points starting the upload worker processes costs more than it saves
+# (e.g. the per-file uploads of a reindex), so they are sent from this process
+PARALLEL_UPLOAD_MIN_POINTS = 16 * UPSERT_BATCH_SIZE
+# Near-duplicate queries (cosine >= threshold) are answered from memory instead of Qdrant
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_THRESHOLD = 0.97
+# Queries this close to a cached one are averaged into its centroid instead of taking a new slot
+QUERY_CACHE_MERGE_THRESHOLD = 0.90
+# The cache is persisted here so it survives restarts; entries expire after a day
+QUERY_CACHE_COLLECTION_NAME = "query_cache_v1"
+QUERY_CACHE_TTL_SECONDS = 24 * 60 * 60
+# How stale this process's view of another process clearing the cache may be
+QUERY_CACHE_GENERATION_TTL_SECONDS = 5.0
 
 
 class QdrantDBManager:
     """
     Manages the connection to Qdrant and ensures the necessary collection exists.
     """
+    # Collections already checked/created in this process; later managers skip the RPCs
+    _collection_checked: set[str] = set()
     client: QdrantClient
+    async_client: Optional[AsyncQdrantClient] = None
+    query_cache: QueryVectorCache
 
-    def __init__(self, host: str = QDRANT_HOST, port: int = QDRANT_PORT):
+    def __init__(self, host: str = QDRANT_HOST, port: int = QDRANT_PORT, pool_size: int = QDRANT_POOL_SIZE):
         """
         Initializes the Qdrant client and ensures the collection is ready.
 
         Args:
             host (str): The host address of the Qdrant instance.
             port (int): The port number of the Qdrant instance.
+            pool_size (int): The number of connections the client keeps open for concurrent requests.
         """
         LOGGER.info(f"Attempting to connect to Qdrant at {host}:{port}...")
         try:
-            
-            
-            # for using qdrant cloud
-            # self.client = QdrantClient(
-            #     url="https://3aa59a3e-1522-4fde-a5e7-6e43b1780b01.eu-west-1-0.aws.cloud.qdrant.io",
-            #     api_key=QDRANT_API_KEY,
-            #     timeout=60
-            # )
-            # self.client = QdrantClient(host=host, port=port, timeout=20)
+            # Set QDRANT_URL / QDRANT_API_KEY to connect to Qdrant Cloud instead
+            self.client = get_qdrant_client(host=host, port=port, pool_size=pool_size)
             LOGGER.info("Successfully connected to Qdrant.")
             self._ensure_collection_exists()
+            self.query_cache = QueryVectorCache(
+                EMBEDDING_DIMENSION,
+                QUERY_CACHE_SIZE,
+                QUERY_CACHE_THRESHOLD,
+                QUERY_CACHE_MERGE_THRESHOLD,
+                store=QueryCacheStore(self.client, QUERY_CACHE_COLLECTION_NAME, EMBEDDING_DIMENSION, QUERY_CACHE_TTL_SECONDS),
+                generation_ttl=QUERY_CACHE_GENERATION_TTL_SECONDS
+            )
+            self.query_cache.warm_start()
 
         except Exception as e:
             LOGGER.info(f"An unexpected error occurred during Qdrant client initialization: {e}")
@@ -55,38 +94,71 @@ class QdrantDBManager:
     def _ensure_collection_exists(self):
         """
         Checks if the specified collection exists, and creates it if it doesn't.
+        Only the first call per process talks to Qdrant.
         """
+        if COLLECTION_NAME in QdrantDBManager._collection_checked:
+            return
         try:
-            self.client.get_collection(collection_name=COLLECTION_NAME)
+            exists = self.client.collection_exists(collection_name=COLLECTION_NAME)
+        except Exception as e:
+            LOGGER.error(f"An unexpected error occurred while checking collection '{COLLECTION_NAME}': {e}")
+            raise
+        if exists:
             LOGGER.info(f"Collection '{COLLECTION_NAME}' already exists.")
+        else:
+            self._create_collection()
+        self._ensure_payload_indexes()
+        QdrantDBManager._collection_checked.add(COLLECTION_NAME)
 
-        except UnexpectedResponse as e:
-            if e.status_code == 404:
-                LOGGER.info(f"Collection '{COLLECTION_NAME}' not found. Creating it now...")
-                try:
-                    self.client.create_collection(
-                        collection_name=COLLECTION_NAME,
-                        vectors_config=models.VectorParams(
-                            size=EMBEDDING_DIMENSION,
-                            distance=DISTANCE_METRIC
-                        )
-                    )
-                    LOGGER.info(f"Collection '{COLLECTION_NAME}' created successfully with vector size {EMBEDDING_DIMENSION}, {DISTANCE_METRIC} distance.")
-                    # Create the payload index after collection creation
-                    self.client.create_payload_index(
-                        collection_name=COLLECTION_NAME,
-                        field_name="file_path",
-                        field_type=models.PayloadSchemaType.KEYWORD
+    def _ensure_payload_indexes(self):
+        """
+        Creates the payload indexes for filtered fields. Re-creating an existing index
+        with the same schema is a no-op, so this is safe to run on every startup.
+        """
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            try:
+                self.client.create_payload_index(
+                    collection_name=COLLECTION_NAME,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                    wait=True
+                )
+                LOGGER.info(f"Index for '{field_name}' is ready in collection '{COLLECTION_NAME}'.")
+            except Exception as e:
+                LOGGER.warning(f"Could not create index for '{field_name}' in collection '{COLLECTION_NAME}': {e}")
+
+    def _create_collection(self):
+        """
+        Creates the collection; its payload indexes are added by _ensure_payload_indexes.
+        """
+        LOGGER.info(f"Collection '{COLLECTION_NAME}' not found. Creating it now...")
+        try:
+            self.client.create_collection(
+                collection_name=COLLECTION_NAME,
+                vectors_config=models.VectorParams(
+                    size=EMBEDDING_DIMENSION,
+                    distance=DISTANCE_METRIC,
+                    # The float32 originals are only read to rescore the quantized candidates,
+                    # so they can live on disk (memory-mapped) instead of in RAM
+                    on_disk=True
+                ),
+                hnsw_config=models.HnswConfigDiff(on_disk=False, m=16, ef_construct=128),
+                # int8 copies of the vectors are kept in RAM for search (~4x smaller than float32)
+                quantization_config=models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
                     )
-                    LOGGER.info(f"Index for 'file_path' created successfully in collection '{COLLECTION_NAME}'.")
-                except Exception as create_exc:
-                    LOGGER.error(f"Failed to create collection '{COLLECTION_NAME}': {create_exc}")
-                    raise
-            else:
-                LOGGER.error(f"Error checking collection '{COLLECTION_NAME}': {e}")
-                raise
-        except Exception as e:
-            LOGGER.error(f"An unexpected error occurred while checking collection '{COLLECTION_NAME}': {e}")
+                )
+            )
+            LOGGER.info(f"Collection '{COLLECTION_NAME}' created successfully with vector size {EMBEDDING_DIMENSION}, {DISTANCE_METRIC} distance.")
+        except Exception as create_exc:
+            # Another process may have created it between the existence check and here
+            if self.client.collection_exists(collection_name=COLLECTION_NAME):
+                LOGGER.info(f"Collection '{COLLECTION_NAME}' was created concurrently; using it.")
+                return
+            LOGGER.error(f"Failed to create collection '{COLLECTION_NAME}': {create_exc}")
             raise
 
 
@@ -99,10 +171,120 @@ class QdrantDBManager:
         """
         return self.client
 
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """
+        Returns the async client, creating it on first use. It is created lazily because
+        its channels are bound to the event loop it is first used on.
+        """
+        if self.async_client is None:
+            self.async_client = get_async_qdrant_client()
+        return self.async_client
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Turns HNSW indexing off for the duration of the block, so bulk upserts skip
+        per-batch graph updates; on exit indexing is restored and the index is built once.
+
+        Usage:
+            with manager.bulk_load():
+                manager.save_embeddings(embeddings, payloads)
+        """
+        self.client.update_collection(
+            collection_name=COLLECTION_NAME,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        try:
+            yield
+        finally:
+            self.client.update_collection(
+                collection_name=COLLECTION_NAME,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD)
+            )
+
+    @asynccontextmanager
+    async def bulk_load_async(self) -> AsyncIterator[None]:
+        """
+        Async counterpart of bulk_load, for use around save_embeddings_async without
+        blocking the event loop on the collection updates.
+
+        Usage:
+            async with manager.bulk_load_async():
+                await manager.save_embeddings_async(embeddings, payloads)
+        """
+        async_client = self._get_async_client()
+        await async_client.update_collection(
+            collection_name=COLLECTION_NAME,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        try:
+            yield
+        finally:
+            await async_client.update_collection(
+                collection_name=COLLECTION_NAME,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD)
+            )
+
+    def _prepare_points(
+            self,
+            embeddings: List[List[float]],
+            payloads: List[Dict[str, Any]],
+        ) -> Optional[Tuple[List[str], np.ndarray]]:
+            """
+            Validates the input and returns content-derived point ids with the unit-normalized vectors.
+
+            Returns:
+                Optional[Tuple[List[str], np.ndarray]]: The ids and a float32 (n, dim) matrix,
+                                                        or None if the input is invalid.
+            """
+            if not embeddings:
+                LOGGER.info("No embeddings provided to save.")
+                return None
+            
+            if len(embeddings) != len(payloads):
+                LOGGER.info("Error: The number of embeddings and payloads must be the same.")
+                return None
+
+            # Re-uploading an unchanged chunk overwrites its point instead of adding a duplicate
+            point_ids = list(map(_stable_point_id, payloads))
+            # DOT distance needs unit vectors for its scores to be cosine similarities
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            return point_ids, vectors
+
+    def _build_batches(
+            self,
+            embeddings: List[List[float]],
+            payloads: List[Dict[str, Any]],
+            batch_size: int,
+        ) -> List[models.Batch]:
+            """
+            Validates the input and turns it into upsert-sized column batches.
+
+            Each batch is converted from a slice of the float32 matrix in one call, and no
+            per-point PointStruct has to be built and validated.
+
+            Returns:
+                List[models.Batch]: The batches, or an empty list if the input is invalid.
+            """
+            prepared = self._prepare_points(embeddings, payloads)
+            if prepared is None:
+                return []
+            point_ids, vectors = prepared
+            return [
+                models.Batch(
+                    ids=point_ids[i:i + batch_size],
+                    vectors=vectors[i:i + batch_size].tolist(),
+                    payloads=payloads[i:i + batch_size]
+                )
+                for i in range(0, len(point_ids), batch_size)
+            ]
+
     def save_embeddings(
             self, 
             embeddings: List[List[float]], 
             payloads: List[Dict[str, Any]],
+            batch_size: int = UPSERT_BATCH_SIZE,
         ) -> bool:
             """
             Saves embeddings and their corresponding payloads to the Qdrant collection.
@@ -111,37 +293,98 @@ class QdrantDBManager:
                 embeddings (List[List[float]]): A list of embedding vectors.
                 payloads (List[Dict[str, Any]]): A list of metadata dictionaries,
                                                 one for each embedding.
+                batch_size (int): The number of points sent per upsert request.
             Returns:
                 bool: True if the operation was successful, False otherwise.
             """
-            if not embeddings:
-                LOGGER.info("No embeddings provided to save.")
-                return False
-            
-            if len(embeddings) != len(payloads):
-                LOGGER.info("Error: The number of embeddings and payloads must be the same.")
+            prepared = self._prepare_points(embeddings, payloads)
+            if prepared is None:
                 return False
+            point_ids, vectors = prepared
 
-
-            point_ids = [uuid.uuid4().hex for _ in embeddings]
-
-            points_to_upsert = [
-                models.PointStruct(
-                    id=point_ids[i],
-                    vector=embedding,
-                    payload=payload
-                )
-                for i, (embedding, payload) in enumerate(zip(embeddings, payloads))
-            ]
+            parallel = UPLOAD_PARALLELISM if len(point_ids) >= PARALLEL_UPLOAD_MIN_POINTS else 1
+            # Start of the final batch, which is the only one waited on
+            last_start = (len(point_ids) - 1) // batch_size * batch_size
 
             try:
-                LOGGER.info(f"Attempting to save {len(points_to_upsert)} points to collection '{COLLECTION_NAME}'...")
+                LOGGER.debug("Attempting to upload %d points to collection '%s' with %d workers...", len(embeddings), COLLECTION_NAME, parallel)
+                if last_start:
+                    # upload_collection slices the matrix into batches itself and spreads them over
+                    # worker processes; no per-point PointStruct is built on this path. The
+                    # batches only need to be acknowledged, not applied
+                    self.client.upload_collection(
+                        collection_name=COLLECTION_NAME,
+                        vectors=vectors[:last_start],
+                        payload=payloads[:last_start],
+                        ids=point_ids[:last_start],
+                        batch_size=batch_size,
+                        parallel=parallel,
+                        wait=False
+                    )
+                # Updates are applied in order, so waiting on the last batch covers the earlier
+                # ones and the points are searchable when this returns
                 self.client.upsert(
                     collection_name=COLLECTION_NAME,
-                    points=points_to_upsert,
-                    wait=True  # Wait for the operation to complete
+                    points=models.Batch(
+                        ids=point_ids[last_start:],
+                        vectors=vectors[last_start:].tolist(),
+                        payloads=payloads[last_start:]
+                    ),
+                    wait=True
                 )
-                LOGGER.info(f"Successfully saved {len(points_to_upsert)} points to '{COLLECTION_NAME}'.")
+                LOGGER.info("Successfully saved %d points to '%s'.", len(embeddings), COLLECTION_NAME)
+                self.query_cache.clear()
+                return True
+            except UnexpectedResponse as e:
+                LOGGER.info(f"Qdrant API error during upsert: {e.status_code} - {e.content.decode() if e.content else 'No content'}")
+                return False
+            except Exception as e:
+                LOGGER.info(f"An unexpected error occurred while saving embeddings: {e}")
+                return False
+
+    async def save_embeddings_async(
+            self,
+            embeddings: List[List[float]],
+            payloads: List[Dict[str, Any]],
+            batch_size: int = UPSERT_BATCH_SIZE,
+        ) -> bool:
+            """
+            Saves embeddings like save_embeddings, but sends the batches concurrently
+            (up to QDRANT_POOL_SIZE at a time) over the async client. Only the final batch
+            waits for the write to be applied, so the points are searchable on return.
+
+            Args:
+                embeddings (List[List[float]]): A list of embedding vectors.
+                payloads (List[Dict[str, Any]]): A list of metadata dictionaries,
+                                                one for each embedding.
+                batch_size (int): The number of points sent per upsert request.
+            Returns:
+                bool: True if the operation was successful, False otherwise.
+            """
+            batches = self._build_batches(embeddings, payloads, batch_size)
+            if not batches:
+                return False
+
+            async_client = self._get_async_client()
+            semaphore = asyncio.Semaphore(QDRANT_POOL_SIZE)
+
+            async def upsert(batch: models.Batch, wait: bool):
+                async with semaphore:
+                    await async_client.upsert(
+                        collection_name=COLLECTION_NAME,
+                        points=batch,
+                        wait=wait
+                    )
+
+            try:
+                LOGGER.debug("Attempting to save %d points to collection '%s' in %d concurrent batches...", len(embeddings), COLLECTION_NAME, len(batches))
+                # Earlier batches only need to be acknowledged; once they all are, waiting on
+                # the last one covers them, since updates are applied in order
+                await asyncio.gather(*(upsert(batch, wait=False) for batch in batches[:-1]))
+                await upsert(batches[-1], wait=True)
+                LOGGER.info("Successfully saved %d points to '%s'.", len(embeddings), COLLECTION_NAME)
+                # The cache persists through the blocking client, so it runs off the event loop
+                await asyncio.to_thread(self.query_cache.clear)
                 return True
             except UnexpectedResponse as e:
                 LOGGER.info(f"Qdrant API error during upsert: {e.status_code} - {e.content.decode() if e.content else 'No content'}")
@@ -154,16 +397,119 @@ class QdrantDBManager:
         self,
         embedding: List[float],
         limit: int = 8,
-        score_threshold: float = None
+        score_threshold: float = None,
+        payload_fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Searches for chunks in Qdrant that are semantically similar to the given embedding.
+        Near-duplicates of recent queries are served from the in-memory query cache.
 
         Args:
             embedding (List[float]): The embedding vector of the query.
             limit (int): The maximum number of similar chunks to retrieve.
             score_threshold (float, optional): Minimum similarity score for a chunk to be returned.
                                               Depends on the distance metric (e.g., for COSINE, higher is better).
+            payload_fields (List[str], optional): Only return these payload fields (e.g. to leave out 'content').
+                                                  Projected searches bypass the query cache.
+
+        Returns:
+            List[Dict[str, Any]]: A list of payloads from the most similar chunks.
+        """
+        if not embedding:
+            LOGGER.info("No embedding provided for search.")
+            return []
+        return self.search_similar_chunks_batch([embedding], limit, score_threshold, payload_fields)[0]
+
+    def search_similar_chunks_batch(
+        self,
+        embeddings: List[List[float]],
+        limit: int = 8,
+        score_threshold: float = None,
+        payload_fields: Optional[List[str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Runs several similarity searches at once. Queries answered by the query cache are
+        skipped; the rest go to Qdrant in a single query_batch_points request.
+
+        Args:
+            embeddings (List[List[float]]): The embedding vectors of the queries.
+            limit (int): The maximum number of similar chunks to retrieve per query.
+            score_threshold (float, optional): Minimum similarity score for a chunk to be returned.
+            payload_fields (List[str], optional): Only return these payload fields (e.g. to leave out 'content').
+                                                  Projected searches bypass the query cache.
+
+        Returns:
+            List[List[Dict[str, Any]]]: The payloads of the most similar chunks, one list per query.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in embeddings]
+        if not embeddings:
+            return results
+        queries = [normalize(embedding) for embedding in embeddings]
+        # The cache only holds full payloads
+        use_cache = payload_fields is None
+        try:
+            misses = []
+            for i, query in enumerate(queries):
+                cached = self.query_cache.get(query, limit, score_threshold) if use_cache else None
+                if cached is None:
+                    misses.append(i)
+                    continue
+                payloads = cached.payloads
+                if payloads is None:
+                    # Restored from the persisted cache, which only keeps point ids: fetch the
+                    # payloads by id (no vector search) and keep them in memory from now on
+                    payloads = self._retrieve_payloads(cached.point_ids)
+                    self.query_cache.put(query, cached.limit, score_threshold, cached.point_ids, payloads)
+                results[i] = payloads[:limit]
+            if len(misses) < len(queries):
+                LOGGER.info("Served %d of %d queries from the query cache.", len(queries) - len(misses), len(queries))
+            if not misses:
+                return results
+
+            responses = self.client.query_batch_points(
+                collection_name=COLLECTION_NAME,
+                requests=[
+                    models.QueryRequest(
+                        query=queries[i].tolist(), # Normalized, to match the stored vectors
+                        limit=limit,
+                        score_threshold=score_threshold, # Only include results above this score
+                        params=SEARCH_PARAMS,
+                        with_payload=True if use_cache else models.PayloadSelectorInclude(include=payload_fields),
+                        with_vector=False # Only payloads are used; a vector is ~6 KB per hit
+                    )
+                    for i in misses
+                ]
+            )
+            for i, response in zip(misses, responses):
+                # Payloads are always requested (full or projected), so every hit carries one
+                payloads = list(map(attrgetter("payload"), response.points))
+                if use_cache:
+                    point_ids = list(map(attrgetter("id"), response.points))
+                    self.query_cache.put(queries[i], limit, score_threshold, point_ids, payloads)
+                results[i] = payloads
+            LOGGER.info("Searched '%s' for %d queries (limit %d).", COLLECTION_NAME, len(misses), limit)
+            return results
+        except Exception as e:
+            LOGGER.info(f"An error occurred during Qdrant search: {e}")
+            return [[] for _ in embeddings]
+
+    async def search_similar_chunks_async(
+        self,
+        embedding: List[float],
+        limit: int = 8,
+        score_threshold: float = None,
+        payload_fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of search_similar_chunks, so several searches can run concurrently
+        with asyncio.gather instead of one after another.
+
+        Args:
+            embedding (List[float]): The embedding vector of the query.
+            limit (int): The maximum number of similar chunks to retrieve.
+            score_threshold (float, optional): Minimum similarity score for a chunk to be returned.
+            payload_fields (List[str], optional): Only return these payload fields (e.g. to leave out 'content').
+                                                  Projected searches bypass the query cache.
 
         Returns:
             List[Dict[str, Any]]: A list of payloads from the most similar chunks.
@@ -171,20 +517,141 @@ class QdrantDBManager:
         if not embedding:
             LOGGER.info("No embedding provided for search.")
             return []
+        query = normalize(embedding)
+        # The cache only holds full payloads
+        use_cache = payload_fields is None
+        # The query cache persists its entries through the blocking client, so its calls are
+        # run on a worker thread instead of on the event loop
+        cached = await asyncio.to_thread(self.query_cache.get, query, limit, score_threshold) if use_cache else None
         try:
-            LOGGER.info(f"Searching in collection '{COLLECTION_NAME}' with limit {limit}...")
-            search_results = self.client.search(
+            if cached is not None:
+                payloads = cached.payloads
+                if payloads is None:
+                    # Restored from the persisted cache, which only keeps point ids
+                    payloads = await self._retrieve_payloads_async(cached.point_ids)
+                    await asyncio.to_thread(self.query_cache.put, query, cached.limit, score_threshold, cached.point_ids, payloads)
+                LOGGER.info("Served %d similar chunks from the query cache.", min(len(payloads), limit))
+                return payloads[:limit]
+            response = await self._get_async_client().query_points(
                 collection_name=COLLECTION_NAME,
-                query_vector=embedding,
+                query=query.tolist(), # Normalized, to match the stored vectors
                 limit=limit,
-                score_threshold=score_threshold # Only include results above this score
+                score_threshold=score_threshold, # Only include results above this score
+                search_params=SEARCH_PARAMS,
+                with_payload=True if use_cache else models.PayloadSelectorInclude(include=payload_fields),
+                with_vectors=False # Only payloads are used; a vector is ~6 KB per hit
             )
-            LOGGER.info(f"Found {len(search_results)} similar chunks.")
-            return [hit.payload for hit in search_results if hit.payload is not None]
+            LOGGER.info("Found %d similar chunks in '%s' (limit %d).", len(response.points), COLLECTION_NAME, limit)
+            payloads = list(map(attrgetter("payload"), response.points))
+            if use_cache:
+                point_ids = list(map(attrgetter("id"), response.points))
+                await asyncio.to_thread(self.query_cache.put, query, limit, score_threshold, point_ids, payloads)
+            return payloads
         except Exception as e:
             LOGGER.info(f"An error occurred during Qdrant search: {e}")
             return []
 
+    def _retrieve_payloads(self, point_ids: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Fetches the payloads of the given points, in the order of `point_ids`.
+        Points that no longer exist are skipped.
+        """
+        points = self.client.retrieve(
+            collection_name=COLLECTION_NAME,
+            ids=point_ids,
+            with_payload=True,
+            with_vectors=False
+        )
+        return _order_payloads(points, point_ids)
+
+    async def _retrieve_payloads_async(self, point_ids: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of _retrieve_payloads.
+        """
+        points = await self._get_async_client().retrieve(
+            collection_name=COLLECTION_NAME,
+            ids=point_ids,
+            with_payload=True,
+            with_vectors=False
+        )
+        return _order_payloads(points, point_ids)
+
+    def reindex_file(
+            self,
+            file_path: str,
+            embeddings: List[List[float]],
+            payloads: List[Dict[str, Any]],
+        ) -> bool:
+            """
+            Replaces every chunk of a file with the given ones in a single request.
+
+            The delete-by-filter and the upsert are sent as one batch_update_points call and
+            applied in order, so there is one round trip and no window in which a search
+            sees the file without any chunks.
+
+            Args:
+                file_path (str): The file whose chunks are replaced.
+                embeddings (List[List[float]]): The embedding vectors of the new chunks.
+                payloads (List[Dict[str, Any]]): The metadata of the new chunks, one per embedding.
+
+            Returns:
+                bool: True if the operation was successful, False otherwise.
+            """
+            prepared = self._prepare_points(embeddings, payloads)
+            if prepared is None:
+                return False
+            point_ids, vectors = prepared
+
+            try:
+                self.client.batch_update_points(
+                    collection_name=COLLECTION_NAME,
+                    update_operations=[
+                        models.DeleteOperation(delete=_file_path_selector(file_path)),
+                        models.UpsertOperation(
+                            upsert=models.PointsBatch(
+                                batch=models.Batch(ids=point_ids, vectors=vectors.tolist(), payloads=payloads)
+                            )
+                        ),
+                    ],
+                    wait=True
+                )
+                LOGGER.info("Reindexed '%s' with %d points in '%s'.", file_path, len(point_ids), COLLECTION_NAME)
+                self.query_cache.clear()
+                return True
+            except UnexpectedResponse as e:
+                LOGGER.info(f"Qdrant API error during reindex: {e.status_code} - {e.content.decode() if e.content else 'No content'}")
+                return False
+            except Exception as e:
+                LOGGER.error(f"Error reindexing chunks for file_path {file_path}: {e}")
+                return False
+
+    def iter_chunks_by_file_path(self, file_path: str, page_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the payloads of every chunk of the given file, one scroll page at a time.
+
+        Args:
+            file_path (str): The file path to match chunks for.
+            page_size (int): Number of chunks fetched per scroll request.
+
+        Yields:
+            Dict[str, Any]: The payload of each chunk.
+        """
+        points = iter_points(
+            self.client,
+            COLLECTION_NAME,
+            scroll_filter=_file_path_selector(file_path).filter,
+            batch_size=page_size
+        )
+        for point in points:
+            if point.payload:
+                yield point.payload
+
+    def get_chunks_by_file_path(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Returns the payloads of every chunk of the given file (see iter_chunks_by_file_path).
+        """
+        return list(self.iter_chunks_by_file_path(file_path))
+
     def delete_chunks_by_file_path(self, file_path: str) -> bool:
         """
         Deletes all chunks associated with a given file_path from the Qdrant collection.
@@ -197,22 +664,83 @@ class QdrantDBManager:
         """
         try:
             LOGGER.info(f"Deleting chunks for file_path: {file_path} from collection '{COLLECTION_NAME}'...")
-            # Use a filter to match chunks with the given file_path
             self.client.delete(
                 collection_name=COLLECTION_NAME,
-                points_selector=models.FilterSelector(
-                    filter=models.Filter(
-                        must=[
-                            models.FieldCondition(
-                                key="file_path",
-                                match=models.MatchValue(value=file_path)
-                            )
-                        ]
-                    )
-                )
+                points_selector=_file_path_selector(file_path)
             )
             LOGGER.info(f"Successfully deleted chunks for file_path: {file_path}")
+            self.query_cache.clear()
             return True
         except Exception as e:
             LOGGER.error(f"Error deleting chunks for file_path {file_path}: {e}")
             return False
+
+    async def delete_chunks_by_file_path_async(self, file_path: str) -> bool:
+        """
+        Async counterpart of delete_chunks_by_file_path.
+
+        Args:
+            file_path (str): The file path to match chunks for deletion.
+
+        Returns:
+            bool: True if deletion was successful, False otherwise.
+        """
+        try:
+            LOGGER.info(f"Deleting chunks for file_path: {file_path} from collection '{COLLECTION_NAME}'...")
+            await self._get_async_client().delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=_file_path_selector(file_path)
+            )
+            LOGGER.info(f"Successfully deleted chunks for file_path: {file_path}")
+            await asyncio.to_thread(self.query_cache.clear)
+            return True
+        except Exception as e:
+            LOGGER.error(f"Error deleting chunks for file_path {file_path}: {e}")
+            return False
+
+
+def _stable_point_id(payload: Dict[str, Any]) -> str:
+    """
+    Derives a point id (a UUID string) from the chunk's file path, start line and content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for field in (payload.get("file_path", ""), payload.get("start_line", ""), payload.get("content", "")):
+        digest.update(str(field).encode("utf-8"))
+        # Field separator, so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(b"\0")
+    return str(uuid.UUID(bytes=digest.digest()))
+
+
+def _file_path_selector(file_path: str) -> models.FilterSelector:
+    """
+    Selects every chunk of the given file (served from the 'file_path' keyword index).
+    """
+    return models.FilterSelector(
+        filter=models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="file_path",
+                    match=models.MatchValue(value=file_path)
+                )
+            ]
+        )
+    )
+
+
+def _order_payloads(points: List[models.Record], point_ids: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Returns the payloads of `points` in the order of `point_ids`, skipping ids that were not found.
+    """
+    payloads_by_id = {point.id: point.payload for point in points}
+    return [payloads_by_id[point_id] for point_id in point_ids if point_id in payloads_by_id]
+
+
+@lru_cache(maxsize=None)
+def get_manager() -> QdrantDBManager:
+    """
+    Returns the process-wide QdrantDBManager, creating it on first use.
+
+    Returns:
+        QdrantDBManager: The shared manager instance.
+    """
+    return QdrantDBManager()
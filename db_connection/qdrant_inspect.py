@@ -0,0 +1,129 @@
+import argparse
+import logging
+from itertools import islice
+from qdrant_client import QdrantClient, models
+from db_connection.client import get_qdrant_client, iter_points
+from db_connection.qdrant import COLLECTION_NAME
+from utils.logger import LOGGER
+
+# Usage (from the project root):
+#   python -m db_connection.qdrant_inspect [--collection NAME] [--only-with-dependencies]
+#                                          [--with-vectors] [--verbose]
+#   python -m db_connection.qdrant_inspect --collection NAME --delete
+
+
+def delete_collection(client: QdrantClient, collection_name: str):
+    """
+    Deletes the given collection.
+    """
+    client.delete_collection(collection_name=collection_name)
+    LOGGER.info(f"Collection '{collection_name}' deleted.")
+
+
+def inspect_qdrant_collection(
+    client: QdrantClient,
+    collection_name: str = COLLECTION_NAME,
+    only_with_dependencies: bool = False,
+    with_vectors: bool = False,
+):
+    """
+    Retrieves a sample of points from the collection and logs their details.
+
+    Args:
+        client (QdrantClient): The client to inspect with.
+        collection_name (str): The collection to inspect.
+        only_with_dependencies (bool): Only sample chunks with a non-empty 'import_dependencies' list.
+        with_vectors (bool): Also fetch each vector (~6 KB per point on the wire); shown with --verbose.
+    """
+    try:
+        LOGGER.info(f"Inspecting collection: '{collection_name}'")
+
+        # Check if collection exists
+        try:
+            collection_info = client.get_collection(collection_name=collection_name)
+            LOGGER.info(f"Collection '{collection_name}' found.")
+            LOGGER.info(f"  Status: {collection_info.status}")
+            LOGGER.info(f"  Points count: {collection_info.points_count}")
+            LOGGER.info(f"  Vectors count: {collection_info.vectors_count}") # Might differ if some points don't have vectors
+            LOGGER.info(f"  Segments count: {collection_info.segments_count}")
+            LOGGER.info(f"  Config: {collection_info.config}")
+        except Exception as e:
+            LOGGER.info(f"Could not get collection info for '{collection_name}': {e}")
+            LOGGER.info("Please ensure the collection exists and the Qdrant server is running.")
+            return
+
+        LOGGER.info("Fetching a sample of points (up to 10):")
+
+        scroll_filter = None
+        if only_with_dependencies:
+            LOGGER.info("Filtering for chunks with non-empty 'import_dependencies' list.")
+            # The field is keyword-indexed by QdrantDBManager, so this is served from the payload index
+            scroll_filter = models.Filter(
+                must_not=[
+                    models.IsEmptyCondition(
+                        is_empty=models.PayloadField(key="import_dependencies")
+                    )
+                ]
+            )
+
+        # Points are streamed page by page; only the first 10 are taken
+        points = islice(
+            iter_points(
+                client,
+                collection_name,
+                scroll_filter=scroll_filter,
+                batch_size=10,
+                with_vectors=with_vectors,
+                # Payloads (with their 'content' blobs) are only shown with --verbose
+                with_payload=LOGGER.isEnabledFor(logging.DEBUG)
+            ),
+            10
+        )
+
+        fetched = 0
+        for i, point in enumerate(points):
+            fetched += 1
+            LOGGER.info("--- Point %d --- ID: %s", i + 1, point.id)
+            # Payloads and vectors are large; only format them when --verbose is on
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                LOGGER.debug("  Payload: %s", point.payload)
+                if point.vector: # Only present with --with-vectors
+                    # log only a snippet of the vector as it can be very long
+                    vector_text = str(point.vector)
+                    LOGGER.debug("  Vector (snippet): %s", vector_text[:100] + "..." if len(vector_text) > 100 else vector_text)
+
+        if not fetched:
+            LOGGER.info("No points found in the collection or failed to retrieve points.")
+            return
+        LOGGER.info(f"Fetched {fetched} points.")
+
+    except Exception as e:
+        LOGGER.error(f"An error occurred: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect (or delete) a Qdrant collection.")
+    parser.add_argument("--collection", default=COLLECTION_NAME, help="Collection to work on.")
+    parser.add_argument("--only-with-dependencies", action="store_true", help="Only sample chunks that have import dependencies.")
+    parser.add_argument("--with-vectors", action="store_true", help="Also fetch the vectors (can be very long).")
+    parser.add_argument("--verbose", action="store_true", help="Log each point's payload (and vector snippet).")
+    parser.add_argument("--delete", action="store_true", help="Delete the collection instead of inspecting it.")
+    args = parser.parse_args()
+    if args.verbose:
+        LOGGER.setLevel(logging.DEBUG)
+
+    # The client is only created here, so importing this module never touches the network
+    client = get_qdrant_client()
+    if args.delete:
+        delete_collection(client, args.collection)
+        return
+    inspect_qdrant_collection(
+        client,
+        collection_name=args.collection,
+        only_with_dependencies=args.only_with_dependencies,
+        with_vectors=args.with_vectors,
+    )
+
+
+if __name__ == "__main__":
+    main()
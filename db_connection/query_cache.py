@@ -0,0 +1,462 @@
+import os
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from qdrant_client import QdrantClient, models
+from db_connection.client import iter_points
+from utils.logger import LOGGER
+
+# Point of the cache collection holding its current generation rather than an entry; entry
+# ids are random 64-bit values and never 0
+GENERATION_POINT_ID = 0
+
+
+def normalize(embedding) -> np.ndarray:
+    """
+    Returns the embedding as a unit-length float32 vector, so a dot product is its cosine similarity.
+
+    Args:
+        embedding: The embedding vector (list of floats or ndarray).
+
+    Returns:
+        np.ndarray: The L2-normalized 1-D float32 vector.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class CacheEntry(NamedTuple):
+    """
+    A cached search result. `payloads` is None for entries restored from the
+    QueryCacheStore, which only persists the point ids.
+    """
+    entry_id: int
+    limit: int
+    score_threshold: Optional[float]
+    point_ids: List[Any]
+    payloads: Optional[List[Dict[str, Any]]]
+
+
+class QueryCacheStore:
+    """
+    Persists QueryVectorCache entries in their own Qdrant collection, so the cache
+    survives restarts and is shared between processes.
+
+    Each entry is stored as a point whose vector is the cache key and whose payload holds
+    the search parameters, the result point ids, an expiry time and the generation it was
+    cached in. The current generation is kept in the GENERATION_POINT_ID point and replaced
+    whenever the cache is cleared, which tells every process sharing the store that its
+    in-memory entries are stale. Persistence is best effort: failures are logged and never
+    break a search.
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str, dimension: int, ttl_seconds: float):
+        """
+        Creates the cache collection if it is missing.
+
+        Args:
+            client (QdrantClient): The client to store entries with.
+            collection_name (str): The collection holding the cache entries.
+            dimension (int): Size of the embedding vectors.
+            ttl_seconds (float): How long a persisted entry stays valid.
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.dimension = dimension
+        self.ttl_seconds = ttl_seconds
+        if not self.client.collection_exists(collection_name=collection_name):
+            LOGGER.info(f"Creating query cache collection '{collection_name}'...")
+            self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE)
+            )
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name="expires_at",
+                field_schema=models.PayloadSchemaType.FLOAT,
+                wait=True
+            )
+
+    def generation(self) -> Optional[str]:
+        """
+        Returns the current generation of the cache, or None if there is none yet.
+
+        Unlike the other methods, a failed read raises: callers must not mistake it for a
+        missing generation and start a new one, which would invalidate every process's cache.
+        """
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[GENERATION_POINT_ID],
+            with_payload=True,
+            with_vectors=False
+        )
+        return points[0].payload["current_generation"] if points else None
+
+    def new_generation(self) -> Optional[str]:
+        """
+        Starts a new generation, which invalidates the entries every process holds in
+        memory; returns it, or None if it could not be written.
+        """
+        generation = uuid.uuid4().hex
+        # The collection requires a vector on every point; this one is never searched
+        vector = [0.0] * self.dimension
+        vector[0] = 1.0
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    models.PointStruct(
+                        id=GENERATION_POINT_ID,
+                        vector=vector,
+                        payload={"current_generation": generation}
+                    )
+                ],
+                wait=True
+            )
+            return generation
+        except Exception as e:
+            LOGGER.warning(f"Could not write query cache generation to '{self.collection_name}': {e}")
+            return None
+
+    def load(self, limit: int, generation: str) -> List[Tuple[np.ndarray, CacheEntry]]:
+        """
+        Drops expired entries and returns up to `limit` of the remaining ones cached in
+        the given generation.
+
+        Args:
+            limit (int): The maximum number of entries to load.
+            generation (str): The current generation of the cache.
+
+        Returns:
+            List[Tuple[np.ndarray, CacheEntry]]: The normalized keys with their entries.
+        """
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=self._expires_filter(lt=time.time()))
+            )
+            points = islice(
+                iter_points(
+                    self.client,
+                    self.collection_name,
+                    scroll_filter=models.Filter(
+                        must=[models.FieldCondition(key="generation", match=models.MatchValue(value=generation))]
+                    ),
+                    with_vectors=True
+                ),
+                limit
+            )
+            return [
+                (
+                    normalize(point.vector),
+                    CacheEntry(
+                        entry_id=point.id,
+                        limit=point.payload["limit"],
+                        score_threshold=point.payload["score_threshold"],
+                        point_ids=point.payload["point_ids"],
+                        payloads=None
+                    )
+                )
+                for point in points
+            ]
+        except Exception as e:
+            LOGGER.warning(f"Could not load query cache from '{self.collection_name}': {e}")
+            return []
+
+    def save(self, key: np.ndarray, entry: CacheEntry, generation: Optional[str]):
+        """
+        Writes (or overwrites) the persisted copy of an entry, cached in `generation`.
+        """
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    models.PointStruct(
+                        id=entry.entry_id,
+                        vector=key.tolist(),
+                        payload={
+                            "limit": entry.limit,
+                            "score_threshold": entry.score_threshold,
+                            "point_ids": entry.point_ids,
+                            "expires_at": time.time() + self.ttl_seconds,
+                            "generation": generation,
+                        }
+                    )
+                ],
+                wait=False
+            )
+        except Exception as e:
+            LOGGER.warning(f"Could not persist query cache entry {entry.entry_id}: {e}")
+
+    def delete(self, entry_ids: List[int]):
+        """
+        Removes the persisted copies of evicted entries.
+        """
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=entry_ids),
+                wait=False
+            )
+        except Exception as e:
+            LOGGER.warning(f"Could not delete query cache entries {entry_ids}: {e}")
+
+    def clear(self) -> Optional[str]:
+        """
+        Starts a new generation and removes every persisted entry; returns the new
+        generation (None if it could not be written).
+        """
+        generation = self.new_generation()
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=self._expires_filter(gte=0)),
+                wait=True
+            )
+        except Exception as e:
+            LOGGER.warning(f"Could not clear query cache collection '{self.collection_name}': {e}")
+        return generation
+
+    @staticmethod
+    def _expires_filter(**range_args) -> models.Filter:
+        return models.Filter(
+            must=[models.FieldCondition(key="expires_at", range=models.Range(**range_args))]
+        )
+
+
+class QueryVectorCache:
+    """
+    Bounded similarity cache for vector search results (SIM-LRU over query centroids).
+
+    A lookup hits when a cached key has a cosine similarity of at least `threshold`
+    with the new query. Keys live in one preallocated float32 matrix, so a lookup is a
+    single matrix-vector product. On insert, a query within `merge_threshold` of an
+    existing key is folded into it as a running mean instead of taking a new row, so
+    clusters of near-identical queries share one entry (keeping the results of the query
+    closest to the centroid); when full, the least recently used entry is overwritten.
+    With a `store`, entries are also persisted and can be restored with warm_start(), and
+    lookups check the store's generation (re-read at most every `generation_ttl` seconds, so
+    a hit costs no round trip): when another process has cleared the cache since, the
+    entries held here are dropped.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 256,
+        threshold: float = 0.97,
+        merge_threshold: float = 0.90,
+        store: Optional[QueryCacheStore] = None,
+        generation_ttl: float = 5.0,
+    ):
+        """
+        Args:
+            dimension (int): Size of the embedding vectors.
+            capacity (int): Maximum number of cached centroids.
+            threshold (float): Minimum cosine similarity for a cached result to be reused.
+            merge_threshold (float): Minimum cosine similarity for a new query to be merged into an existing centroid.
+            store (QueryCacheStore, optional): Where entries are persisted.
+            generation_ttl (float): Seconds a read of the store's generation is trusted for.
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.merge_threshold = merge_threshold
+        self.store = store
+        self.generation_ttl = generation_ttl
+        self._keys = np.zeros((capacity, dimension), dtype=np.float32)
+        # The query each entry's results were searched for (its centroid drifts away from it)
+        self._result_queries = np.zeros((capacity, dimension), dtype=np.float32)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        # Number of queries averaged into each centroid
+        self._counts = np.zeros(capacity, dtype=np.int64)
+        # One entry per row of self._keys
+        self._entries: List[Optional[CacheEntry]] = [None] * capacity
+        self._size = 0
+        # Generation of the store the entries held here belong to
+        self._generation: Optional[str] = None
+        # When the generation was last read from the store (time.monotonic())
+        self._generation_checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def warm_start(self):
+        """
+        Fills the cache with the entries persisted in the store, if there is one.
+        """
+        if self.store is None:
+            return
+        try:
+            generation = self.store.generation()
+        except Exception as e:
+            # Starting a new generation here would invalidate every other process's cache
+            LOGGER.warning(f"Could not read query cache generation; starting with an empty cache: {e}")
+            return
+        if generation is None:
+            generation = self.store.new_generation() # First use of this store
+        loaded = self.store.load(self.capacity, generation) if generation is not None else []
+        with self._lock:
+            self._generation = generation
+            self._generation_checked_at = time.monotonic()
+            for key, entry in loaded[:self.capacity - self._size]:
+                index = self._size
+                self._size += 1
+                self._keys[index] = key
+                self._result_queries[index] = key
+                self._counts[index] = 1
+                self._last_used[index] = time.monotonic()
+                self._entries[index] = entry
+        LOGGER.info(f"Loaded {len(loaded)} query cache entries.")
+
+    def get(self, query: np.ndarray, limit: int, score_threshold: Optional[float] = None) -> Optional[CacheEntry]:
+        """
+        Returns the entry of the closest stored query, or None on a miss.
+
+        An entry only qualifies if it was searched with the same score_threshold and at
+        least `limit` results, so its results can be cut down to the requested size.
+
+        Args:
+            query (np.ndarray): The normalized query embedding.
+            limit (int): The number of results requested.
+            score_threshold (float, optional): The score threshold of the search.
+
+        Returns:
+            Optional[CacheEntry]: The cached entry, or None if nothing is close enough.
+        """
+        self._check_generation()
+        with self._lock:
+            if not self._size:
+                return None
+            similarities = self._keys[:self._size] @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            # Closest first; usually the first candidate already qualifies
+            for index in candidates[np.argsort(similarities[candidates])[::-1]]:
+                entry = self._entries[index]
+                if entry.limit >= limit and entry.score_threshold == score_threshold:
+                    self._last_used[index] = time.monotonic()
+                    return entry
+            return None
+
+    def put(
+        self,
+        query: np.ndarray,
+        limit: int,
+        score_threshold: Optional[float],
+        point_ids: List[Any],
+        payloads: List[Dict[str, Any]],
+    ):
+        """
+        Stores a search result for a query, either by merging it into the closest compatible
+        centroid or in a new row (evicting the least recently used entry when full).
+
+        A merge always moves the centroid, but the entry only takes the new results if the
+        query is closer to the moved centroid than the query its current results came from;
+        otherwise the queries that hit the centroid would get the results of whichever
+        query happened to be merged last.
+
+        Args:
+            query (np.ndarray): The normalized query embedding.
+            limit (int): The number of results that was requested.
+            score_threshold (float, optional): The score threshold of the search.
+            point_ids (List[Any]): The ids of the result points.
+            payloads (List[Dict[str, Any]]): The search result payloads.
+        """
+        evicted_id = None
+        with self._lock:
+            index = self._find_merge_target(query, limit, score_threshold)
+            if index is not None:
+                count = self._counts[index]
+                centroid = normalize((self._keys[index] * count + query) / (count + 1))
+                self._keys[index] = centroid
+                self._counts[index] = count + 1
+                existing = self._entries[index]
+                if query @ centroid > self._result_queries[index] @ centroid:
+                    entry = CacheEntry(existing.entry_id, limit, score_threshold, point_ids, payloads)
+                    self._result_queries[index] = query
+                elif existing.payloads is None and existing.point_ids == point_ids:
+                    # The same results, fetched for an entry restored without its payloads
+                    entry = existing._replace(payloads=payloads)
+                else:
+                    entry = existing
+            else:
+                if self._size < self.capacity:
+                    index = self._size
+                    self._size += 1
+                else:
+                    index = int(np.argmin(self._last_used[:self._size]))
+                    evicted_id = self._entries[index].entry_id
+                self._keys[index] = query
+                self._result_queries[index] = query
+                self._counts[index] = 1
+                # Random 64-bit id, also used as the point id of the persisted copy (never
+                # GENERATION_POINT_ID)
+                entry_id = int.from_bytes(os.urandom(8), "little") or 1
+                entry = CacheEntry(entry_id, limit, score_threshold, point_ids, payloads)
+            self._last_used[index] = time.monotonic()
+            self._entries[index] = entry
+            key = self._keys[index].copy()
+            generation = self._generation
+
+        # Network calls happen outside the lock so lookups are never blocked on them
+        if self.store is not None:
+            self.store.save(key, entry, generation)
+            if evicted_id is not None:
+                self.store.delete([evicted_id])
+
+    def _find_merge_target(self, query: np.ndarray, limit: int, score_threshold: Optional[float]) -> Optional[int]:
+        """
+        Returns the row of the closest centroid that was searched with the same parameters
+        and is within merge_threshold of the query, or None. Caller must hold the lock.
+        """
+        if not self._size:
+            return None
+        similarities = self._keys[:self._size] @ query
+        candidates = np.flatnonzero(similarities >= self.merge_threshold)
+        for index in candidates[np.argsort(similarities[candidates])[::-1]]:
+            entry = self._entries[index]
+            if entry.limit == limit and entry.score_threshold == score_threshold:
+                return int(index)
+        return None
+
+    def _check_generation(self):
+        """
+        Drops the entries held here if the store has moved to a new generation, i.e. the
+        cache was cleared (by this or another process) since they were cached. The store is
+        only asked once the last read is older than generation_ttl.
+        """
+        if self.store is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._generation_checked_at < self.generation_ttl:
+                return
+            # Claimed before the read, so concurrent lookups do not all go to the store
+            self._generation_checked_at = now
+        try:
+            generation = self.store.generation()
+        except Exception as e:
+            LOGGER.warning(f"Could not read query cache generation: {e}")
+            return # Keep serving rather than failing every lookup
+        if generation is None:
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._size = 0
+                self._entries = [None] * self.capacity
+                self._generation = generation
+
+    def clear(self):
+        """
+        Drops every cached entry; called whenever the collection is written to. With a
+        store, this also invalidates the entries of every other process sharing it.
+        """
+        with self._lock:
+            self._size = 0
+            self._entries = [None] * self.capacity
+        if self.store is not None:
+            generation = self.store.clear()
+            with self._lock:
+                self._generation = generation
+                self._generation_checked_at = time.monotonic()
@@ -1,113 +1,254 @@
-
 # app/parsers/laravel_processor.py
 
+import mmap
+import multiprocessing
 import os
 import re
-from typing import List, Dict, Any
-from tree_sitter import Node
-from tree_sitter_languages import get_parser, get_language
-from tree_sitter import Parser
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Dict, Any
+import tree_sitter_php as tsphp
+from tree_sitter import Language, Node, Parser, Query, QueryCursor
 from utils.logger import LOGGER
 
+# Loading the grammar and building a Parser is not free, so it is done once per process
+_PHP_LANGUAGE: Language | None = None
+_PHP_PARSER: Parser | None = None
+_PHP_QUERY: Query | None = None
+_PHP_PARSER_LOCK = threading.Lock()
+# Below this many files the process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 32
+# Files handed to a worker per round-trip
+CHUNK_WORKER_BATCH = 16
+# Start method of the chunking pool. A host process may hold gRPC channels and threads, which a
+# forked child would inherit in whatever state they were in, so workers are started from a
+# clean process instead (forkserver where available, e.g. not on Windows)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Any non-whitespace byte; used to skip blank files without copying them
+_NON_BLANK_RE = re.compile(rb"\S")
+# Definitions that become chunks or give them context; each capture is named after its kind
+_PHP_DEFINITIONS_QUERY = """
+(namespace_definition) @namespace
+(class_declaration) @class
+(method_declaration) @method
+(function_definition) @function
+"""
+
+
+def _get_php_language() -> Language:
+    """
+    Returns the PHP grammar, loading it on first use.
+    """
+    global _PHP_LANGUAGE
+    if _PHP_LANGUAGE is None:
+        with _PHP_PARSER_LOCK:
+            if _PHP_LANGUAGE is None:
+                _PHP_LANGUAGE = Language(tsphp.language_php())
+    return _PHP_LANGUAGE
+
+
+def _get_php_parser() -> Parser:
+    """
+    Returns the process-wide PHP parser, loading it on first use.
+    """
+    global _PHP_PARSER
+    if _PHP_PARSER is None:
+        language = _get_php_language()
+        with _PHP_PARSER_LOCK:
+            if _PHP_PARSER is None:
+                _PHP_PARSER = Parser(language)
+                LOGGER.info("Tree-sitter PHP parser loaded successfully.")
+    return _PHP_PARSER
+
+
+def _get_php_query() -> Query:
+    """
+    Returns the compiled PHP definitions query, compiling it on first use.
+    """
+    global _PHP_QUERY
+    if _PHP_QUERY is None:
+        language = _get_php_language()
+        with _PHP_PARSER_LOCK:
+            if _PHP_QUERY is None:
+                _PHP_QUERY = Query(language, _PHP_DEFINITIONS_QUERY)
+    return _PHP_QUERY
+
+
+def _scan_files(
+    root: str,
+    extensions: frozenset,
+    excluded_dirs: frozenset = frozenset(),
+    excluded_files: frozenset = frozenset(),
+    skip_hidden_dirs: bool = False,
+) -> Iterator[str]:
+    """
+    Yields the paths of files under `root` whose lower-cased extension (with the dot) is in `extensions`.
+
+    os.scandir gives each entry's type from the directory listing, so no stat is needed per
+    file, and excluded directories (by name, or by path relative to the scan root such as
+    'storage/logs') are never entered. Directories still to list are kept on a stack rather
+    than in nested generators, so each path is yielded once however deep it is.
+    """
+    pending = [(root, "")]
+    while pending:
+        directory, relative_dir = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue # Unreadable directories are skipped, as os.walk does
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    relative_path = f"{relative_dir}{name}"
+                    if name in excluded_dirs or relative_path in excluded_dirs or (skip_hidden_dirs and name.startswith('.')):
+                        continue
+                    pending.append((entry.path, f"{relative_path}/"))
+                elif name not in excluded_files and os.path.splitext(name)[1].lower() in extensions:
+                    yield entry.path
+
 
 class LaravelProcessor:
     def __init__(self, root_path: str):
         self.root_path = root_path
         self.supported_extensions = [".php"] # Primarily for PHP in Laravel
+        self._extensions = frozenset(self.supported_extensions)
         try:
-            self.parser = get_parser("php")
-            LOGGER.info("Tree-sitter PHP parser loaded successfully.")
+            self.parser = _get_php_parser()
         except Exception as e: # pylint: disable=broad-except
-            LOGGER.info(f"Failed to load tree-sitter PHP parser: {e}. Will attempt regex-based chunking for PHP files. Chunking quality may be significantly affected for complex files.")
+            LOGGER.error(f"Failed to load tree-sitter PHP parser: {e}. PHP files will not be chunked.")
             self.parser = None # Handle parser loading failure gracefully
 
     def chunk_codebase(self) -> List[Dict[str, Any]]:
         chunks: List[Dict[str, Any]] = []
-        for dirpath, _, filenames in os.walk(self.root_path):
-            for filename in filenames:
-                if filename.endswith(tuple(self.supported_extensions)):
-                    full_path = os.path.join(dirpath, filename)
-                    if self.parser:
-                        # Prioritize tree-sitter based chunking
-                        file_chunks = self.chunk_using_treesitter(full_path)
-                    else:
-                        # Fallback to regex-based chunking if tree-sitter parser is not available
-                        LOGGER.info(f"Using regex-based chunking for: {full_path}")
-                        file_chunks = self.chunk_using_regex(full_path)
-                    chunks.extend(file_chunks)
+        file_paths = list(_scan_files(self.root_path, self._extensions))
+        if len(file_paths) < PARALLEL_MIN_FILES:
+            for full_path in file_paths:
+                chunks.extend(self._chunk_file(full_path))
+        else:
+            try:
+                # Parsing is CPU-bound, so files are spread over processes; each worker
+                # builds its own processor (and parser) once in the initializer
+                with ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=_POOL_CONTEXT,
+                    initializer=_init_chunk_worker,
+                    initargs=(self.root_path,)
+                ) as executor:
+                    for file_chunks in executor.map(_chunk_file_in_worker, file_paths, chunksize=CHUNK_WORKER_BATCH):
+                        chunks.extend(file_chunks)
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                # e.g. no working multiprocessing in a restricted environment; the parser is
+                # not safe to share between threads, so fall back to the serial loop
+                LOGGER.warning(f"Process pool unavailable ({e}); chunking files serially.")
+                chunks = []
+                for full_path in file_paths:
+                    chunks.extend(self._chunk_file(full_path))
         LOGGER.info(f"Created {len(chunks)} chunks out of the code")
         return chunks
+
+    def _chunk_file(self, full_path: str) -> List[Dict[str, Any]]:
+        """
+        Chunks one file with tree-sitter (see chunk_using_treesitter).
+        """
+        return self.chunk_using_treesitter(full_path)
     
     def _extract_node_text(self, node: Node, content_bytes: bytes) -> str:
         """Extracts text from a tree-sitter node."""
         return content_bytes[node.start_byte:node.end_byte].decode("utf-8", errors="ignore")
 
-    def _traverse_node(self, node: Node, content_bytes: bytes, file_path: str, current_namespace: str = "", current_class_name: str = "") -> List[Dict[str, Any]]:
+    def _build_function_chunk(self, node: Node, content_bytes: bytes, file_path: str, current_namespace: str, current_class_name: str) -> Dict[str, Any] | None:
         """
-        Recursively traverses the AST to find and create chunks for functions, methods, etc.
+        Creates the chunk for a function or method node, with its namespace/class context.
         """
-        chunks = []
         node_type = node.type
+        name_node = node.child_by_field_name('name')
+        if not name_node:
+            return None
+        function_name = self._extract_node_text(name_node, content_bytes)
+        
+        # Construct a fully qualified name for better context
+        full_name_parts = []
+        if current_namespace:
+            full_name_parts.append(current_namespace)
+        if current_class_name and current_class_name.split("\\")[-1] != function_name: # Avoid class::class for constructors
+            # Use the fully qualified class name for methods
+            full_name_parts.append(current_class_name.split("\\")[-1] if node_type == 'method_declaration' else "") # Get simple class name for method
+        
+        qualified_prefix = "\\".join(filter(None, full_name_parts))
+        if qualified_prefix and node_type == 'method_declaration':
+            full_function_name = f"{qualified_prefix}::{function_name}"
+        elif qualified_prefix:
+             full_function_name = f"{qualified_prefix}\\{function_name}"
+        else:
+            full_function_name = function_name
 
-        # Capture namespace to provide context
-        if node_type == 'namespace_definition':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                current_namespace = self._extract_node_text(name_node, content_bytes)
+        chunk_content = self._extract_node_text(node, content_bytes)
+        return {
+            "content": chunk_content,
+            "metadata": {
+                "file": file_path,
+                "type": "method" if node_type == 'method_declaration' else "function",
+                "namespace": current_namespace,
+                "class_name": current_class_name.split("\\")[-1] if current_class_name and node_type == 'method_declaration' else "",
+                "function_name": function_name,
+                "full_name": full_function_name,
+                "start_line": node.start_point[0] + 1, # tree-sitter is 0-indexed for lines
+                "end_line": node.end_point[0] + 1
+            }
+        }
 
-        # Capture class name to provide context
-        elif node_type == 'class_declaration':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                class_name_only = self._extract_node_text(name_node, content_bytes)
-                # Update current_class_name with full namespace if available
-                current_class_name = f"{current_namespace}\\{class_name_only}" if current_namespace else class_name_only
-                # Optionally, you could create a chunk for the class definition itself here
-                # For now, we focus on methods/functions within the class.
+    def _extract_definitions(self, root_node: Node, content_bytes: bytes, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Finds functions and methods with the compiled PHP query (matching runs in C) and
+        creates chunks for them. Namespace and class context is tracked from the captures'
+        byte ranges while walking them in source order.
 
-        # Capture functions and methods as primary chunks
-        elif node_type == 'method_declaration' or node_type == 'function_definition':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                function_name = self._extract_node_text(name_node, content_bytes)
-                
-                # Construct a fully qualified name for better context
-                full_name_parts = []
-                if current_namespace:
-                    full_name_parts.append(current_namespace)
-                if current_class_name and current_class_name.split("\\")[-1] != function_name: # Avoid class::class for constructors
-                    # Use the fully qualified class name for methods
-                    full_name_parts.append(current_class_name.split("\\")[-1] if node_type == 'method_declaration' else "") # Get simple class name for method
-                
-                qualified_prefix = "\\".join(filter(None, full_name_parts))
-                if qualified_prefix and node_type == 'method_declaration':
-                    full_function_name = f"{qualified_prefix}::{function_name}"
-                elif qualified_prefix:
-                     full_function_name = f"{qualified_prefix}\\{function_name}"
-                else:
-                    full_function_name = function_name
+        A namespace applies to every definition after it up to the next namespace, so the
+        statement form `namespace App\\Models;` now qualifies the sibling classes that follow
+        it. The recursive walker this replaced only applied a namespace inside the namespace
+        node's own subtree, which is empty for the statement form.
+        """
+        chunks = []
+        # The cursor groups the captured nodes by capture name; they are flattened to
+        # (node, name) pairs in source order, an enclosing node before the nodes it contains
+        captures = [
+            (node, capture_name)
+            for capture_name, nodes in QueryCursor(_get_php_query()).captures(root_node).items()
+            for node in nodes
+        ]
+        captures.sort(key=lambda capture: (capture[0].start_byte, -capture[0].end_byte))
 
-                chunk_content = self._extract_node_text(node, content_bytes)
-                chunks.append({
-                    "content": chunk_content,
-                    "metadata": {
-                        "file": file_path,
-                        "type": "method" if node_type == 'method_declaration' else "function",
-                        "namespace": current_namespace,
-                        "class_name": current_class_name.split("\\")[-1] if current_class_name and node_type == 'method_declaration' else "",
-                        "function_name": function_name,
-                        "full_name": full_function_name,
-                        "start_line": node.start_point[0] + 1, # tree-sitter is 0-indexed for lines
-                        "end_line": node.end_point[0] + 1
-                    }
-                })
-                # We've captured this function/method as a chunk, so we don't recurse further into its body
-                # to avoid overly granular sub-chunks unless specifically desired.
-                return chunks 
+        current_namespace = ""
+        # (end_byte, qualified class name) of the classes enclosing the current capture
+        class_stack: List[tuple[int, str]] = []
+        # Functions/methods are not split further, so anything inside an emitted chunk is skipped
+        covered_until = -1
+        for node, capture_name in captures:
+            while class_stack and node.start_byte >= class_stack[-1][0]:
+                class_stack.pop()
+            if node.start_byte < covered_until:
+                continue
 
-        # Recurse for other node types to find nested structures
-        for child_node in node.children:
-            chunks.extend(self._traverse_node(child_node, content_bytes, file_path, current_namespace, current_class_name))
+            if capture_name == "namespace":
+                name_node = node.child_by_field_name('name')
+                # A namespace applies to everything after it, up to the next namespace
+                current_namespace = self._extract_node_text(name_node, content_bytes) if name_node else ""
+            elif capture_name == "class":
+                name_node = node.child_by_field_name('name')
+                if name_node:
+                    class_name_only = self._extract_node_text(name_node, content_bytes)
+                    qualified_class_name = f"{current_namespace}\\{class_name_only}" if current_namespace else class_name_only
+                    class_stack.append((node.end_byte, qualified_class_name))
+            else:
+                current_class_name = class_stack[-1][1] if class_stack else ""
+                chunk = self._build_function_chunk(node, content_bytes, file_path, current_namespace, current_class_name)
+                if chunk:
+                    chunks.append(chunk)
+                    covered_until = node.end_byte
         return chunks
 
     def chunk_using_treesitter(self, file_path: str) -> List[Dict[str, Any]]:
@@ -117,182 +258,80 @@ class LaravelProcessor:
         chunks: List[Dict[str, Any]] = []
         try:
             with open(file_path, "rb") as f: # Read as bytes for tree-sitter
-                content_bytes = f.read()
-            
-            if not content_bytes.strip(): # Skip empty or whitespace-only files
-                return []
+                # mmap cannot map an empty file, and there is nothing to chunk anyway
+                if not os.fstat(f.fileno()).st_size:
+                    return []
+                # The parser and the node slices read straight from the mapping, so the
+                # file is never copied whole onto the Python heap
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content_bytes:
+                    if not _NON_BLANK_RE.search(content_bytes): # Skip whitespace-only files
+                        return []
 
-            tree = self.parser.parse(content_bytes)
-            # Start traversal from the root node of the AST
-            chunks.extend(self._traverse_node(tree.root_node, content_bytes, file_path))
-            
-            # Fallback: if no specific chunks (functions/methods) were found,
-            # and the file has content, chunk the whole file.
-            # This is useful for scripts, config files, or files without standard function/class structures.
-            if not chunks and content_bytes.strip():
-                 chunks.append({
-                    "content": content_bytes.decode("utf-8", errors="ignore"),
-                    "metadata": {
-                        "file": file_path,
-                        "type": "file_content", # Indicate it's the whole file
-                        "namespace": "",
-                        "class_name": "",
-                        "function_name": "",
-                        "full_name": os.path.basename(file_path), # Use filename as a general name
-                        "start_line": 1,
-                        "end_line": content_bytes.decode("utf-8", errors="ignore").count('\n') + 1
-                    }
-                })
+                    tree = self.parser.parse(content_bytes)
+                    chunks.extend(self._extract_definitions(tree.root_node, content_bytes, file_path))
+
+                    # Fallback: if no specific chunks (functions/methods) were found,
+                    # and the file has content, chunk the whole file.
+                    # This is useful for scripts, config files, or files without standard function/class structures.
+                    if not chunks:
+                        # One copy of the file, decoded once; lines are counted on the raw bytes
+                        whole_file = content_bytes[:]
+                        chunks.append({
+                            "content": whole_file.decode("utf-8", errors="ignore"),
+                            "metadata": {
+                                "file": file_path,
+                                "type": "file_content", # Indicate it's the whole file
+                                "namespace": "",
+                                "class_name": "",
+                                "function_name": "",
+                                "full_name": os.path.basename(file_path), # Use filename as a general name
+                                "start_line": 1,
+                                "end_line": whole_file.count(b"\n") + 1
+                            }
+                        })
         except FileNotFoundError:
             LOGGER.info(f"File not found during chunking: {file_path}")
         except Exception as e:
             LOGGER.error(f"Error parsing {file_path} with tree-sitter: {e}")
         return chunks
     
-    def _extract_block_with_braces(self, text_content: str, match_start_offset: int) -> tuple[str | None, int]:
-        """
-        Tries to extract a code block enclosed in curly braces.
-        Starts searching for the first '{' at or after match_start_offset.
-        Returns the block content (including braces) and the end offset in the original text_content.
-        NOTE: This is a simplified implementation and can be fooled by braces in comments or strings.
-        """
-        try:
-            open_brace_index = text_content.index('{', match_start_offset)
-        except ValueError:
-            return None, -1 # No opening brace found
-
-        brace_level = 1
-        current_pos = open_brace_index + 1
-        content_lines = text_content.splitlines()
-
-        while current_pos < len(text_content):
-            char = text_content[current_pos]
-            if char == '{':
-                brace_level += 1
-            elif char == '}':
-                brace_level -= 1
-                if brace_level == 0:
-                    block_text = text_content[open_brace_index : current_pos + 1]
-                    return block_text, current_pos + 1
-            current_pos += 1
-        return None, -1 # Unmatched brace
-
-    def chunk_using_regex(self, file_path: str) -> List[Dict[str, Any]]:
-        """
-        Chunks PHP code using regular expressions. Less accurate than tree-sitter.
-        """
-        chunks: List[Dict[str, Any]] = []
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        except FileNotFoundError:
-            LOGGER.info(f"File not found during regex chunking: {file_path}")
-            return []
-        except Exception as e:
-            LOGGER.error(f"Error reading file {file_path} for regex chunking: {e}")
-            return []
-
-        if not content.strip():
-            return []
-
-        # Regex patterns (simplified for clarity, can be made more comprehensive)
-        # For capturing current namespace
-        namespace_pattern = re.compile(r"^\s*namespace\s+([^;]+);", re.MULTILINE)
-        # For classes
-        class_pattern = re.compile(
-            r"^\s*(?:abstract\s+|final\s+)*class\s+([a-zA-Z_\x7f-\xff][a-zA-Z0-9_\x7f-\xff]*)(?:\s+extends\s+[^{]+)?(?:\s+implements\s+[^{]+)?\s*{",
-            re.MULTILINE
-        )
-        # For functions/methods
-        function_pattern = re.compile(
-            r"^\s*(?:(?:public|protected|private|static)\s+)*(?:function)\s+([a-zA-Z_\x7f-\xff][a-zA-Z0-9_\x7f-\xff]*)\s*\([^)]*\)\s*(?:[:]\s*\w+\s*)?{",
-            re.MULTILINE
-        )
-
-        current_namespace = ""
-        ns_match = namespace_pattern.search(content)
-        if ns_match:
-            current_namespace = ns_match.group(1).strip()
-
-        # Find classes and functions
-        # Note: This simple iteration won't handle nested classes/functions well for context.
-        # It processes them as they appear in the file.
-        definitions = []
-        for pattern, def_type in [(class_pattern, "class"), (function_pattern, "function")]: # Order matters if functions can be outside classes
-            for match in pattern.finditer(content):
-                definitions.append({"match": match, "type": def_type})
-        
-        # Sort by start position to process in order
-        definitions.sort(key=lambda x: x["match"].start())
-
-        for definition in definitions:
-            match = definition["match"]
-            def_type = definition["type"]
-            name = match.group(1)
-            
-            block_content, _ = self._extract_block_with_braces(content, match.start())
-            
-            if block_content:
-                start_line = content.count('\n', 0, match.start()) + 1
-                end_line = start_line + block_content.count('\n')
-                
-                # Basic metadata, less rich than tree-sitter
-                metadata = {
-                    "file": file_path,
-                    "type": def_type, # Could be 'method' if inside a class context, harder with pure regex
-                    "namespace": current_namespace, # Global namespace for the file
-                    "class_name": name if def_type == "class" else "", # Simplified
-                    "function_name": name if def_type == "function" else "",
-                    "full_name": f"{current_namespace}\\{name}" if current_namespace else name,
-                    "start_line": start_line,
-                    "end_line": end_line,
-                }
-                chunks.append({"content": block_content, "metadata": metadata})
-
-        if not chunks and content.strip(): # Fallback to whole file if no regex chunks found
-            chunks.append({
-                "content": content,
-                "metadata": {
-                    "file": file_path, "type": "file_content_regex",
-                    "full_name": os.path.basename(file_path),
-                    "start_line": 1, "end_line": content.count('\n') + 1
-                }
-            })
-        return chunks
-        
     def _get_files_to_process(self, project_path: str) -> list[str]:
             """
             Identifies relevant files in the project path for processing.
             Filters by extension and excludes common unnecessary directories/files.
             """
-            filepaths = []
             # Tailored for Laravel, but can be expanded.
             # `chunk_codebase` uses `self.supported_extensions` which is currently just ".php".
             # This method provides a broader filter if used elsewhere or if `supported_extensions` is expanded.
-            allowed_extensions = {
-                ".php", ".blade.php", # Core Laravel files
+            allowed_extensions = frozenset({
+                ".php", # Core Laravel files (including .blade.php)
                 ".js", ".vue", ".ts",  # Frontend assets
                 ".css", ".scss",       # Styles
                 ".env", ".md", ".txt", ".json", ".yaml", ".yml", # Config, docs, data
-            }
-            excluded_dirs = {
+            })
+            excluded_dirs = frozenset({
                 ".git", "__pycache__", "node_modules", "vendor", # Common and PHP vendor
                 "storage/framework", "storage/logs", "storage/app/public", # Laravel specific storage
                 "public/build", "public/hot", # Laravel Vite/Mix build output
                 "bootstrap/cache", # Laravel cache
                 "target", "build", "dist", ".venv", "venv", # General build/env dirs
-            }
-            excluded_files = {".DS_Store", "Thumbs.db", ".phpunit.result.cache"}
+            })
+            excluded_files = frozenset({".DS_Store", "Thumbs.db", ".phpunit.result.cache"})
 
             LOGGER.info(f"Scanning for files in: {project_path}")
-            for root, dirs, files in os.walk(project_path, topdown=True):
-                # Modify dirs in-place to skip excluded directories
-                dirs[:] = [d for d in dirs if d not in excluded_dirs and not d.startswith('.')]
-                for file_name in files:
-                    if file_name in excluded_files:
-                        continue
-                    _, ext = os.path.splitext(file_name)
-                    if ext.lower() in allowed_extensions:
-                        filepaths.append(os.path.join(root, file_name))
+            filepaths = list(_scan_files(project_path, allowed_extensions, excluded_dirs, excluded_files, skip_hidden_dirs=True))
             LOGGER.info(f"Found {len(filepaths)} files to process.")
-            return filepaths
\ No newline at end of file
+            return filepaths
+
+
+# Per-process processor used by chunk_codebase's worker pool
+_WORKER_PROCESSOR: LaravelProcessor | None = None
+
+
+def _init_chunk_worker(root_path: str):
+    global _WORKER_PROCESSOR
+    _WORKER_PROCESSOR = LaravelProcessor(root_path)
+
+
+def _chunk_file_in_worker(file_path: str) -> List[Dict[str, Any]]:
+    return _WORKER_PROCESSOR._chunk_file(file_path)
@@ -0,0 +1,123 @@
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from dto.value_objects import CodeChunk
+from utils.logger import LOGGER
+
+# Default location of the cache, relative to the working directory
+PARSE_CACHE_PATH = ".laravel_ast_cache.sqlite"
+# Version of the chunk extraction in php_processor.py; bump it whenever a change there alters
+# the chunks extracted from a file, so chunks cached by the older code are not served again
+EXTRACTOR_VERSION = 2
+
+
+class ParseCache:
+    """
+    Persistent cache of the chunks extracted from each source file, keyed by the file's
+    path, the kind of parse (e.g. 'controller', 'route') and the SHA-256 of its content.
+    Entries live in a table named after the extractor version; tables of other versions
+    are dropped on open.
+
+    A file whose content has not changed since it was last parsed is served from here
+    without running tree-sitter. Caching is best effort: database errors are logged and
+    treated as a miss.
+    """
+
+    def __init__(self, db_path: str = PARSE_CACHE_PATH, version: int = EXTRACTOR_VERSION):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            db_path (str): Path of the SQLite file.
+            version (int): Version of the extraction the cached chunks come from.
+        """
+        self.db_path = db_path
+        self._table = f"parse_cache_v{int(version)}"
+        # Shared by the request threads of the app, so access is serialized with a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._in_batch = False
+        with self._lock:
+            stale_tables = [
+                name for (name,) in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'parse_cache%' AND name != ?",
+                    (self._table,)
+                )
+            ]
+            for name in stale_tables:
+                self._conn.execute(f'DROP TABLE "{name}"')
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "path TEXT NOT NULL, kind TEXT NOT NULL, sha256 BLOB NOT NULL, chunks BLOB NOT NULL, "
+                "PRIMARY KEY (path, kind))"
+            )
+            self._conn.commit()
+
+    def get(self, path: str, kind: str, sha256: bytes) -> Optional[List[CodeChunk]]:
+        """
+        Returns the cached chunks of a file, or None if it was not parsed with this content
+        (or its entry cannot be unpickled, e.g. after CodeChunk changed).
+
+        Args:
+            path (str): The file path.
+            kind (str): The kind of parse the chunks came from.
+            sha256 (bytes): The SHA-256 digest of the file's current content.
+
+        Returns:
+            Optional[List[CodeChunk]]: The cached chunks, or None on a miss.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT chunks FROM {self._table} WHERE path = ? AND kind = ? AND sha256 = ?",
+                    (path, kind, sha256)
+                ).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except Exception as e:
+            LOGGER.warning(f"Could not read parse cache entry for {path}: {e}")
+            return None
+
+    def put(self, path: str, kind: str, sha256: bytes, chunks: List[CodeChunk]):
+        """
+        Stores (or replaces) the chunks of a file. Outside of batch() the write is committed
+        right away; inside it, with the rest of the batch.
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self._table} (path, kind, sha256, chunks) VALUES (?, ?, ?, ?)",
+                    (path, kind, sha256, pickle.dumps(chunks, protocol=pickle.HIGHEST_PROTOCOL))
+                )
+                if not self._in_batch:
+                    self._conn.commit()
+        except Exception as e:
+            LOGGER.warning(f"Could not write parse cache entry for {path}: {e}")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Groups the writes made inside the block into a single transaction, so a full
+        codebase analysis pays for one commit (and fsync) instead of one per file.
+        """
+        self._in_batch = True
+        try:
+            yield
+        finally:
+            self._in_batch = False
+            try:
+                with self._lock:
+                    self._conn.commit()
+            except Exception as e:
+                LOGGER.warning(f"Could not commit parse cache: {e}")
+
+    def close(self):
+        """
+        Commits pending writes and closes the database connection.
+        """
+        with self._lock:
+            try:
+                self._conn.commit()
+            finally:
+                self._conn.close()
@@ -1,25 +1,103 @@
+import mmap
+import multiprocessing
 import os
-import json
+import re
+import sys
+import hashlib
+from collections import OrderedDict, defaultdict, deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import asdict
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import tree_sitter_php as tsphp
 # import tree_sitter_javascript as tsjs
 # import tree_sitter_html as tshtml
-from tree_sitter import Language, Parser, Node
+from tree_sitter import Language, Parser, Node, Query, QueryCursor, Tree
+from pydantic import TypeAdapter
 from dto.value_objects import CodeChunk
+from langugae_processors.parse_cache import ParseCache
 from utils.logger import LOGGER
 
+# Below this many files to parse, the process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 32
+# Files handed to a worker per round-trip
+PARSE_WORKER_BATCH = 16
+# Threads hashing files ahead of the cache lookups, and how many files are in flight
+READ_AHEAD_THREADS = 4
+READ_AHEAD_FILES = 8
+# Files whose last source and tree are kept for incremental re-parsing (least recently used
+# dropped first); only single-file updates use them
+TREE_CACHE_SIZE = 64
+# Start method of the parse pools. The app process holds gRPC channels and threads, which a
+# forked child would inherit in whatever state they were in, so workers are started from a
+# clean process instead (forkserver where available, e.g. not on Windows)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Per-process processor of a parse worker, set by _init_parse_worker
+_WORKER_PROCESSOR: Optional["LaravelProcessor"] = None
+# Kind under which Blade templates are recorded in _pending_files (also their chunk type)
+BLADE_KIND = "blade_template"
+# Never descended into when looking for source files
+EXCLUDED_DIRS = frozenset({"vendor", "node_modules", ".git"})
+# Blade directives counted in a template's metadata, in the order they are reported
+BLADE_DIRECTIVES = ("extends", "section", "yield", "include", "component")
+# Any of BLADE_DIRECTIVES, plus the quoted view name of @extends('...') / @include('...')
+_BLADE_DIRECTIVE_RE = re.compile(r"""@(extends|section|yield|include|component)(?:\(['"](.+?)['"]\))?""")
+# Fallback for use statements the tree has no clauses for: plain, aliased, function and
+# const imports, in one pass over the source
+_USE_STATEMENT_RE = re.compile(
+    rb'use\s+(?:function\s+|const\s+)?([\\A-Za-z0-9_]+(?:\\[A-Za-z0-9_]+)*)(?:\s+as\s+[A-Za-z0-9_]+)?\s*;',
+    re.IGNORECASE
+)
+# Laravel-specific references picked up as dependencies by _extract_dependencies
+_LARAVEL_DEPENDENCY_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    rb'new\s+([A-Z][A-Za-z0-9_]*)',  # new ClassName()
+    rb'::class',  # SomeClass::class
+    rb'@extends\([\'"]([^\'"]+)[\'"]\)',  # Blade extends
+    rb'@include\([\'"]([^\'"]+)[\'"]\)',  # Blade includes
+))
+# A PHP open tag at the start of a file, after an optional UTF-8 BOM and whitespace
+_PHP_OPEN_TAG_RE = re.compile(rb"(?:\xef\xbb\xbf)?\s*<\?php", re.IGNORECASE)
+# Static calls on the Route facade, e.g. Route::get(...); the #eq? predicate is checked in C
+ROUTE_CALLS_QUERY = '(scoped_call_expression scope: (name) @scope (#eq? @scope "Route")) @call'
+# Everything _extract_php_chunks needs from a file, found in a single pass over its tree:
+# the classes, their methods, and the names imported by its use clauses
+PHP_CHUNKS_QUERY = """
+(class_declaration) @class
+(method_declaration) @method
+(namespace_use_clause (qualified_name) @use)
+"""
+# Node types looked up with _query_nodes; a query is compiled for each
+QUERIED_NODE_TYPES = (
+    "method_declaration",
+    "member_call_expression",
+    "scoped_call_expression",
+)
+
+# The grammar and the queries are loaded and compiled once per process and shared by every
+# LaravelProcessor; only the Parser (which is not thread-safe) is created per instance
+PHP_LANGUAGE = Language(tsphp.language_php())
+# Matching runs in tree-sitter's C code instead of a Python walk over every node
+_NODE_QUERIES = {
+    node_type: Query(PHP_LANGUAGE, f"({node_type}) @node")
+    for node_type in QUERIED_NODE_TYPES
+}
+_ROUTE_CALLS_QUERY = Query(PHP_LANGUAGE, ROUTE_CALLS_QUERY)
+_PHP_CHUNKS_QUERY = Query(PHP_LANGUAGE, PHP_CHUNKS_QUERY)
+# JSON serializer built once from the CodeChunk schema, used by export_chunks
+_CODE_CHUNK_ADAPTER = TypeAdapter(CodeChunk)
+
 
 class LaravelProcessor:
-    def __init__(self):
+    def __init__(self, parse_cache: Optional[ParseCache] = None):
         # Initialize parsers
 
         # self.js_parser = Parser()
         # self.html_parser = Parser()
 
         # Load languages
-        PHP_LANGUAGE = Language(tsphp.language_php())
         self.php_parser = Parser(PHP_LANGUAGE)
 
         # JS_LANGUAGE = Language(tsjs.language())
@@ -29,12 +107,57 @@ class LaravelProcessor:
         # self.js_parser.set_language(JS_LANGUAGE)
         # self.html_parser.set_language(HTML_LANGUAGE)
 
-        self.chunks: List[CodeChunk] = []
+        # Also builds the by-type index of the chunks (see the chunks setter)
+        self.chunks = []
+        # Chunks of files parsed before (in this or an earlier run) with unchanged content
+        self.parse_cache = parse_cache if parse_cache is not None else ParseCache()
+        # Last source and tree of each parsed file, so an edited file is reparsed incrementally
+        self._tree_cache: "OrderedDict[str, Tuple[bytes, Tree]]" = OrderedDict()
+        # While analyze_codebase runs: the (path, kind) of the files found by the walk, which
+        # are read and parsed together at the end of it
+        self._pending_files: Optional[List[Tuple[Path, str]]] = None
+        # Blade chunk of each template with the (mtime_ns, size) it was built from
+        self._blade_stat_cache: Dict[str, Tuple[int, int, CodeChunk]] = {}
+
+    @property
+    def chunks(self) -> List[CodeChunk]:
+        """The chunks found so far"""
+        return self._chunks
+
+    @chunks.setter
+    def chunks(self, chunks: List[CodeChunk]):
+        # Callers reset the processor by assigning a new list, so the index is rebuilt here
+        self._chunks = []
+        self._chunks_by_type: Dict[str, List[CodeChunk]] = defaultdict(list)
+        self._add_chunks(chunks)
+
+    def _add_chunks(self, chunks: Iterable[CodeChunk]):
+        """Append chunks, keeping the by-type index used by get_chunks_by_type in step"""
+        for chunk in chunks:
+            self._chunks.append(chunk)
+            self._chunks_by_type[chunk.type].append(chunk)
 
     def analyze_codebase(self, laravel_root: str) -> List[CodeChunk]:
         """Analyze entire Laravel codebase and return chunks"""
         laravel_path = Path(laravel_root)
         # Analyze different Laravel directories
+        # Files are collected during the walk, then hashed ahead on threads and the ones not in
+        # the parse cache parsed in one go; cache writes are committed once, at the end
+        self._pending_files = []
+        try:
+            with self.parse_cache.batch():
+                self._analyze_directories(laravel_path)
+                self._parse_pending(self._pending_files, self._read_pending(self._pending_files))
+        finally:
+            self._pending_files = None
+        
+        return self.chunks
+
+    def _analyze_directories(self, laravel_path: Path):
+        """
+        Walks the Laravel directories in a fixed order. Each file is parsed as it is found,
+        or only recorded while analyze_codebase runs; the chunks end up in this order either way.
+        """
         self._analyze_controllers(laravel_path / "app/Http/Controllers")
         self._analyze_models(laravel_path / "app/Models")
         self._analyze_routes(laravel_path / "routes")
@@ -58,15 +181,13 @@ class LaravelProcessor:
         self._analyze_bootstrap_app(laravel_path / "bootstrap/app.php")
         self._analyze_public_index(laravel_path / "public/index.php")
         self._analyze_tests(laravel_path / "tests")
-        
-        return self.chunks
 
     def _analyze_controllers(self, controllers_path: Path):
         """Analyze Laravel controllers"""
         if not controllers_path.exists():
             return
 
-        for php_file in controllers_path.rglob("*.php"):
+        for php_file in _iter_files(controllers_path, ".php"):
             self._parse_php_file(php_file, "controller")
 
     def _analyze_models(self, models_path: Path):
@@ -74,7 +195,7 @@ class LaravelProcessor:
         if not models_path.exists():
             return
 
-        for php_file in models_path.rglob("*.php"):
+        for php_file in _iter_files(models_path, ".php"):
             self._parse_php_file(php_file, "model")
 
     def _analyze_routes(self, routes_path: Path):
@@ -82,21 +203,21 @@ class LaravelProcessor:
         if not routes_path.exists():
             return
 
-        for php_file in routes_path.glob("*.php"):
+        for php_file in _iter_files(routes_path, ".php", recursive=False):
             self._parse_route_file(php_file)
 
     def _analyze_seeders(self, seeders_path: Path):
         """Analyze database seeders"""
         if not seeders_path.exists():
             return
-        for php_file in seeders_path.rglob("*.php"): # rglob for nested seeders
+        for php_file in _iter_files(seeders_path, ".php"): # recursive, for nested seeders
             self._parse_php_file(php_file, "seeder")
 
     def _analyze_factories(self, factories_path: Path):
         """Analyze model factories"""
         if not factories_path.exists():
             return
-        for php_file in factories_path.rglob("*.php"): # rglob for nested factories
+        for php_file in _iter_files(factories_path, ".php"): # recursive, for nested factories
             self._parse_php_file(php_file, "factory")
 
     def _analyze_migrations(self, migrations_path: Path):
@@ -104,7 +225,7 @@ class LaravelProcessor:
         if not migrations_path.exists():
             return
 
-        for php_file in migrations_path.glob("*.php"):
+        for php_file in _iter_files(migrations_path, ".php", recursive=False):
             self._parse_php_file(php_file, "migration")
 
     def _analyze_views(self, views_path: Path):
@@ -112,7 +233,7 @@ class LaravelProcessor:
         if not views_path.exists():
             return
 
-        for blade_file in views_path.rglob("*.blade.php"):
+        for blade_file in _iter_files(views_path, ".blade.php"):
             self._parse_blade_file(blade_file)
 
     def _analyze_middleware(self, middleware_path: Path):
@@ -120,7 +241,7 @@ class LaravelProcessor:
         if not middleware_path.exists():
             return
 
-        for php_file in middleware_path.rglob("*.php"):
+        for php_file in _iter_files(middleware_path, ".php"):
             self._parse_php_file(php_file, "middleware")
 
     def _analyze_requests(self, requests_path: Path):
@@ -128,7 +249,7 @@ class LaravelProcessor:
         if not requests_path.exists():
             return
 
-        for php_file in requests_path.rglob("*.php"):
+        for php_file in _iter_files(requests_path, ".php"):
             self._parse_php_file(php_file, "form_request")
 
     def _analyze_services(self, services_path: Path):
@@ -136,7 +257,7 @@ class LaravelProcessor:
         if not services_path.exists():
             return
 
-        for php_file in services_path.rglob("*.php"):
+        for php_file in _iter_files(services_path, ".php"):
             self._parse_php_file(php_file, "service")
 
     def _analyze_config(self, config_path: Path):
@@ -144,56 +265,56 @@ class LaravelProcessor:
         if not config_path.exists():
             return
 
-        for php_file in config_path.glob("*.php"):
+        for php_file in _iter_files(config_path, ".php", recursive=False):
             self._parse_php_file(php_file, "config")
 
     def _analyze_providers(self, providers_path: Path):
         """Analyze service providers"""
         if not providers_path.exists():
             return
-        for php_file in providers_path.rglob("*.php"):
+        for php_file in _iter_files(providers_path, ".php"):
             self._parse_php_file(php_file, "provider")
 
     def _analyze_commands(self, commands_path: Path):
         """Analyze Artisan console commands"""
         if not commands_path.exists():
             return
-        for php_file in commands_path.rglob("*.php"):
+        for php_file in _iter_files(commands_path, ".php"):
             self._parse_php_file(php_file, "command")
 
     def _analyze_events(self, events_path: Path):
         """Analyze event classes"""
         if not events_path.exists():
             return
-        for php_file in events_path.rglob("*.php"):
+        for php_file in _iter_files(events_path, ".php"):
             self._parse_php_file(php_file, "event")
 
     def _analyze_listeners(self, listeners_path: Path):
         """Analyze event listener classes"""
         if not listeners_path.exists():
             return
-        for php_file in listeners_path.rglob("*.php"):
+        for php_file in _iter_files(listeners_path, ".php"):
             self._parse_php_file(php_file, "listener")
 
     def _analyze_jobs(self, jobs_path: Path):
         """Analyze job classes"""
         if not jobs_path.exists():
             return
-        for php_file in jobs_path.rglob("*.php"):
+        for php_file in _iter_files(jobs_path, ".php"):
             self._parse_php_file(php_file, "job")
 
     def _analyze_notifications(self, notifications_path: Path):
         """Analyze notification classes"""
         if not notifications_path.exists():
             return
-        for php_file in notifications_path.rglob("*.php"):
+        for php_file in _iter_files(notifications_path, ".php"):
             self._parse_php_file(php_file, "notification")
 
     def _analyze_rules(self, rules_path: Path):
         """Analyze custom validation rules"""
         if not rules_path.exists():
             return
-        for php_file in rules_path.rglob("*.php"):
+        for php_file in _iter_files(rules_path, ".php"):
             self._parse_php_file(php_file, "validation_rule")
 
     def _analyze_exceptions_handler(self, handler_file_path: Path):
@@ -205,7 +326,7 @@ class LaravelProcessor:
         """Analyze custom helper files (if any)"""
         if not helpers_path.exists() or not helpers_path.is_dir():
             return
-        for php_file in helpers_path.rglob("*.php"):
+        for php_file in _iter_files(helpers_path, ".php"):
             self._parse_php_file(php_file, "helper")
 
     def _analyze_bootstrap_app(self, bootstrap_file_path: Path):
@@ -221,71 +342,235 @@ class LaravelProcessor:
         if not tests_path.exists():
             return
         # Tests can be in subdirectories like Unit, Feature
-        for php_file in tests_path.rglob("*.php"):
+        for php_file in _iter_files(tests_path, ".php"):
             self._parse_php_file(php_file, "test")
 
     def _parse_php_file(self, file_path: Path, file_type: str):
         """Parse a PHP file and extract meaningful chunks"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            return
+        self._parse_with_cache(file_path, file_type)
 
-        tree = self.php_parser.parse(bytes(content, 'utf8'))
+    def _parse_route_file(self, file_path: Path):
+        """Parse Laravel route files"""
+        self._parse_with_cache(file_path, "route")
+
+    def _parse_with_cache(self, file_path: Path, kind: str):
+        """
+        Adds the chunks of a file, parsing it only if its content is not in the parse cache.
+        During analyze_codebase, the file is only recorded; see _read_pending.
+
+        Args:
+            file_path (Path): The file to parse.
+            kind (str): The file type the chunks are extracted as; part of the cache key.
+        """
+        if self._pending_files is not None:
+            self._pending_files.append((file_path, kind))
+            return
+        content_bytes, digest = _read_and_hash(file_path)
+        chunks = self.parse_cache.get(str(file_path), kind, digest)
+        if chunks is None:
+            chunks = self._parse_source(file_path, kind, content_bytes)
+            self.parse_cache.put(str(file_path), kind, digest, chunks)
+        self._add_chunks(chunks)
+
+    def _read_pending(self, pending: List[Tuple[Path, str]]) -> List[Optional[List[CodeChunk]]]:
+        """
+        Hashes the files collected during analyze_codebase and looks them up in the parse
+        cache. Up to READ_AHEAD_FILES files are hashed on threads ahead of the lookups, so
+        disk I/O overlaps with the cache work instead of alternating with it. Blade templates
+        are not tree-sitter parsed, so their chunks are built here and never miss.
+
+        Returns:
+            List[Optional[List[CodeChunk]]]: The cached chunks of each file of `pending`,
+                                             None for the misses, for _parse_pending.
+        """
+        cached = []
+        files = iter(pending)
+        with ThreadPoolExecutor(max_workers=READ_AHEAD_THREADS) as executor:
+            def read_ahead(file_path: Path, kind: str):
+                return file_path, kind, None if kind == BLADE_KIND else executor.submit(_hash_file, file_path)
+
+            in_flight = deque(read_ahead(*file) for file in islice(files, READ_AHEAD_FILES))
+            while in_flight:
+                file_path, kind, future = in_flight.popleft()
+                for next_file in islice(files, 1):
+                    in_flight.append(read_ahead(*next_file))
+                if future is None:
+                    cached.append(self._blade_chunks(file_path))
+                else:
+                    cached.append(self.parse_cache.get(str(file_path), kind, future.result()))
+        return cached
+
+    def _parse_pending(self, files: List[Tuple[Path, str]], cached: List[Optional[List[CodeChunk]]]):
+        """
+        Parses the cache misses found by _read_pending, across a process pool when there
+        are enough of them, and caches their chunks. Then adds the chunks of every file,
+        cached or parsed, in collection order, so the order does not depend on the cache.
+
+        Each file is read where it is parsed, so the parent never holds the sources of all
+        the misses at once (nor pickles them to the workers).
+        """
+        misses = [i for i, chunks in enumerate(cached) if chunks is None]
+        pending = [files[i] for i in misses]
+        results = None
+        if len(pending) >= PARALLEL_MIN_FILES:
+            try:
+                # Parsing is CPU-bound, so files are spread over processes; each worker
+                # builds its own processor (and parser) once in the initializer, so no more
+                # workers are started than there are batches to hand out
+                workers = min(os.cpu_count() or 1, -(-len(pending) // PARSE_WORKER_BATCH))
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT, initializer=_init_parse_worker) as executor:
+                    results = list(executor.map(
+                        _parse_file_in_worker,
+                        [file_path for file_path, _ in pending],
+                        [kind for _, kind in pending],
+                        chunksize=PARSE_WORKER_BATCH
+                    ))
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                LOGGER.warning(f"Process pool unavailable ({e}); parsing files serially.")
+        if results is None:
+            # Like the workers, a full analysis keeps no trees; see _parse_incremental
+            results = [self._parse_file(file_path, kind, incremental=False) for file_path, kind in pending]
+        for i, (file_path, kind), (digest, chunks) in zip(misses, pending, results):
+            # Keyed by the digest of the content that was actually parsed
+            self.parse_cache.put(str(file_path), kind, digest, chunks)
+            cached[i] = chunks
+        for chunks in cached:
+            self._add_chunks(chunks)
+
+    def _parse_file(self, file_path: Path, kind: str, incremental: bool = True) -> Tuple[bytes, List[CodeChunk]]:
+        """
+        Reads and parses a file; returns the SHA-256 digest of what was read with its chunks.
+        """
+        if incremental:
+            # The source is kept with the tree for the next incremental parse
+            content_bytes, digest = _read_and_hash(file_path)
+            return digest, self._parse_source(file_path, kind, content_bytes, incremental)
+        # Nothing of the source outlives the parse, so the file is parsed (and hashed) straight
+        # from a read-only mapping instead of being copied into a bytes object first
+        with open(file_path, "rb") as f:
+            # mmap cannot map an empty file
+            if not os.fstat(f.fileno()).st_size:
+                return hashlib.sha256(b"").digest(), []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).digest(), self._parse_source(file_path, kind, mm, incremental)
+
+    def _parse_source(self, file_path: Path, kind: str, content_bytes: bytes, incremental: bool = True) -> List[CodeChunk]:
+        """
+        Parses a file's source and extracts its chunks. The source is never decoded as a
+        whole, only the text taken from it (invalid UTF-8 in it is replaced). A file that
+        does not start with a PHP open tag (generated caches, HTML, data dumps) yields no
+        chunks, so it is not handed to tree-sitter at all.
+
+        Args:
+            file_path (Path): The file the source was read from.
+            kind (str): The file type the chunks are extracted as ('route' for route files).
+            content_bytes (bytes): The file's source (or a read-only mmap of it when not incremental).
+            incremental (bool): Reuse (and keep) the file's previous tree; see _parse_incremental.
+        """
+        if not _PHP_OPEN_TAG_RE.match(content_bytes):
+            return []
+        if incremental:
+            tree = self._parse_incremental(str(file_path), content_bytes)
+        else:
+            tree = self.php_parser.parse(content_bytes)
+        if kind == "route":
+            return self._extract_route_chunks(tree, content_bytes, file_path, kind)
+        return self._extract_php_chunks(tree, content_bytes, file_path, kind)
+
+    def _parse_incremental(self, path: str, content_bytes: bytes) -> Tree:
+        """
+        Parses a file, reusing its previous tree if it was parsed before (the trees of the
+        last TREE_CACHE_SIZE files parsed this way are kept).
+
+        The changed region is taken as everything between the longest common prefix and
+        suffix of the old and new source; after Tree.edit() tree-sitter only re-parses
+        the subtrees touching that region instead of the whole file.
+        """
+        previous = self._tree_cache.get(path)
+        if previous is None:
+            tree = self.php_parser.parse(content_bytes)
+        else:
+            old_bytes, old_tree = previous
+            if old_bytes == content_bytes:
+                tree = old_tree
+            else:
+                old_tree.edit(**_edit_between(old_bytes, content_bytes))
+                tree = self.php_parser.parse(content_bytes, old_tree=old_tree)
+        self._tree_cache[path] = (content_bytes, tree)
+        self._tree_cache.move_to_end(path)
+        if len(self._tree_cache) > TREE_CACHE_SIZE:
+            self._tree_cache.popitem(last=False)
+        return tree
+
+    def _extract_php_chunks(self, tree: Tree, source: bytes, file_path: Path, file_type: str) -> List[CodeChunk]:
+        """Extract class and method chunks from a parsed PHP file"""
+        chunks = []
+        # One walk of the tree finds the classes, methods and use clauses; each method is then
+        # attached to the class it is declared in
+        captures = QueryCursor(_PHP_CHUNKS_QUERY).captures(tree.root_node)
+        methods_by_class: Dict[int, List[Node]] = defaultdict(list)
+        for method_node in sorted(captures.get("method", []), key=lambda n: n.start_byte):
+            class_node = _enclosing_class(method_node)
+            if class_node is not None:
+                methods_by_class[class_node.id].append(method_node)
+        # The use statements are file-wide, so they are extracted once and shared by every chunk.
+        # The chunks are built with model_construct: every field comes from the tree and already
+        # has its declared type, and validation would give each chunk its own copy of the list
+        dependencies = self._extract_dependencies(captures.get("use", []), source)
+        # Repeated on every chunk of the file (and across files, for the type), so one
+        # shared string each instead of a copy per chunk
+        path = str(file_path)
+        method_type = sys.intern(f"{file_type}_method")
 
         # Extract classes
-        for class_node in self._query_nodes(tree.root_node, "class_declaration"):
-            class_name = self._get_node_text(class_node.child_by_field_name("name"), content)
+        for class_node in sorted(captures.get("class", []), key=lambda n: n.start_byte):
+            class_name = self._get_node_text(class_node.child_by_field_name("name"), source)
+            method_nodes = methods_by_class.get(class_node.id, [])
 
-            chunk = CodeChunk(
+            chunk = CodeChunk.model_construct(
                 type=file_type,
                 name=class_name,
-                file_path=str(file_path),
+                file_path=path,
                 start_line=class_node.start_point[0] + 1,
                 end_line=class_node.end_point[0] + 1,
-                content=self._get_node_text(class_node, content),
-                metadata=self._extract_class_metadata(class_node, content),
-                import_dependencies=self._extract_dependencies(tree.root_node, content),
+                content=self._get_node_text(class_node, source),
+                metadata=self._extract_class_metadata(class_node, source, method_nodes),
+                import_dependencies=dependencies,
                 method_dependencies=[]
             )
-            self.chunks.append(chunk)
+            chunks.append(chunk)
 
             # Extract methods within the class
-            for method_node in self._query_nodes(class_node, "method_declaration"):
-                method_name = self._get_node_text(method_node.child_by_field_name("name"), content)
+            for method_node in method_nodes:
+                method_name = self._get_node_text(method_node.child_by_field_name("name"), source)
 
-                method_chunk = CodeChunk(
-                    type=f"{file_type}_method",
+                method_chunk = CodeChunk.model_construct(
+                    type=method_type,
                     name=f"{class_name}::{method_name}",
-                    file_path=str(file_path),
+                    file_path=path,
                     start_line=method_node.start_point[0] + 1,
                     end_line=method_node.end_point[0] + 1,
-                    content=self._get_node_text(method_node, content),
-                    metadata=self._extract_method_metadata(method_node, content), # Keep existing metadata extraction
-                    import_dependencies=self._extract_dependencies(tree.root_node, content),
-                    method_dependencies=self._extract_internal_method_calls(method_node, content) # Add internal method call dependencies
+                    content=self._get_node_text(method_node, source),
+                    metadata=self._extract_method_metadata(method_node, source), # Keep existing metadata extraction
+                    import_dependencies=dependencies,
+                    method_dependencies=self._extract_internal_method_calls(method_node, source) # Add internal method call dependencies
                 )
-                self.chunks.append(method_chunk)
-
-    def _parse_route_file(self, file_path: Path):
-        """Parse Laravel route files"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            return
+                chunks.append(method_chunk)
+        return chunks
 
-        tree = self.php_parser.parse(bytes(content, 'utf8'))
+    def _extract_route_chunks(self, tree: Tree, source: bytes, file_path: Path, kind: str) -> List[CodeChunk]:
+        """Extract one chunk per route definition from a parsed route file"""
+        chunks = []
 
         # Look for Route:: method calls
-        route_calls = self._find_route_definitions(tree.root_node, content)
+        route_calls = self._find_route_definitions(tree.root_node, source)
+        path = str(file_path)
 
         for i, route_call in enumerate(route_calls):
             chunk = CodeChunk(
                 type="route",
                 name=f"Route_{i + 1}",
-                file_path=str(file_path),
+                file_path=path,
                 start_line=route_call['start_line'],
                 end_line=route_call['end_line'],
                 content=route_call['content'],
@@ -294,81 +579,96 @@ class LaravelProcessor:
                 method_dependencies=[]
                 #TODO: need to look into router dependencies
             )
-            self.chunks.append(chunk)
+            chunks.append(chunk)
+        return chunks
 
     def _parse_blade_file(self, file_path: Path):
         """Parse Blade template files"""
+        if self._pending_files is not None:
+            # Recorded like the PHP files, so its chunk keeps its place in the walk order
+            self._pending_files.append((file_path, BLADE_KIND))
+            return
+        self._add_chunks(self._blade_chunks(file_path))
+
+    def _blade_chunks(self, file_path: Path) -> List[CodeChunk]:
+        """Returns the chunk of a Blade template (none if it is not UTF-8)"""
+        # An unchanged template (same mtime and size) is not read again
+        st = file_path.stat()
+        cached = self._blade_stat_cache.get(str(file_path))
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return [cached[2]]
+
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
         except UnicodeDecodeError:
-            return
+            return []
 
         # For Blade files, we'll chunk by sections or components
         # This is a simplified approach - you might want more sophisticated parsing
+        metadata, dependencies = self._extract_blade_metadata_and_dependencies(content)
 
         chunk = CodeChunk(
-            type="blade_template",
+            type=BLADE_KIND,
             name=file_path.stem,
             file_path=str(file_path),
             start_line=1,
-            end_line=len(content.splitlines()),
+            # Same as len(content.splitlines()) for '\n' line endings, without building the list
+            end_line=content.count("\n") + (1 if content and not content.endswith("\n") else 0),
             content=content,
-            metadata=self._extract_blade_metadata(content),
-            import_dependencies=self._extract_blade_dependencies(content),
+            metadata=metadata,
+            import_dependencies=dependencies,
             method_dependencies=[]
         )
-        self.chunks.append(chunk)
+        self._blade_stat_cache[str(file_path)] = (st.st_mtime_ns, st.st_size, chunk)
+        return [chunk]
 
     def _query_nodes(self, node: Node, node_type: str) -> List[Node]:
-        """Find all nodes of a specific type"""
-        results = []
-        if node.type == node_type:
-            results.append(node)
-
-        for child in node.children:
-            results.extend(self._query_nodes(child, node_type))
+        """Find all nodes of a specific type (including `node` itself), in document order"""
+        nodes = QueryCursor(_NODE_QUERIES[node_type]).captures(node).get("node", [])
+        # Outer nodes before the nodes nested in them, like a pre-order walk
+        return sorted(nodes, key=lambda n: (n.start_byte, -n.end_byte))
 
-        return results
-
-    def _get_node_text(self, node: Node, source_code: str) -> str:
+    def _get_node_text(self, node: Node, source_code: bytes) -> str:
         """Get the text content of a node"""
         if node is None:
             return ""
-        return source_code[node.start_byte:node.end_byte]
+        return source_code[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
 
-    def _extract_class_metadata(self, class_node: Node, content: str) -> Dict[str, Any]:
-        """Extract metadata from a class node"""
+    def _extract_class_metadata(self, class_node: Node, source: bytes, methods: Optional[List[Node]] = None) -> Dict[str, Any]:
+        """Extract metadata from a class node (`methods`: its method nodes, if already looked up)"""
         metadata = {}
 
         # Check if it extends another class
-        if class_node.child_by_field_name("superclass"):
-            superclass = self._get_node_text(class_node.child_by_field_name("superclass"), content)
-            metadata["extends"] = superclass
+        superclass_node = class_node.child_by_field_name("superclass")
+        if superclass_node:
+            metadata["extends"] = self._get_node_text(superclass_node, source)
 
         # Check for implements
-        if class_node.child_by_field_name("interfaces"):
-            interfaces = self._get_node_text(class_node.child_by_field_name("interfaces"), content)
-            metadata["implements"] = interfaces
+        interfaces_node = class_node.child_by_field_name("interfaces")
+        if interfaces_node:
+            metadata["implements"] = self._get_node_text(interfaces_node, source)
 
         # Count methods
-        methods = self._query_nodes(class_node, "method_declaration")
+        if methods is None:
+            methods = self._query_nodes(class_node, "method_declaration")
         metadata["method_count"] = len(methods)
         metadata["method_names"] = [
-            self._get_node_text(m.child_by_field_name("name"), content)
+            self._get_node_text(m.child_by_field_name("name"), source)
             for m in methods
         ]
 
         return metadata
 
-    def _extract_method_metadata(self, method_node: Node, content: str) -> Dict[str, Any]:
+    def _extract_method_metadata(self, method_node: Node, source: bytes) -> Dict[str, Any]:
         """Extract metadata from a method node"""
         metadata = {}
 
         # Check visibility
         for child in method_node.children:
             if child.type == "visibility_modifier":
-                metadata["visibility"] = self._get_node_text(child, content)
+                # One of a handful of values; interned so all methods share them
+                metadata["visibility"] = sys.intern(self._get_node_text(child, source))
                 break
 
         # Check if static
@@ -385,59 +685,34 @@ class LaravelProcessor:
             
         return metadata
  
-    def _extract_dependencies(self, root_node: Node, content: str) -> List[str]:
-        """Extract use statements and dependencies - FIXED VERSION"""
+    def _extract_dependencies(self, use_names: List[Node], source: bytes) -> List[str]:
+        """
+        Extract use statements and dependencies - FIXED VERSION
+
+        `use_names` are the qualified names of the file's use clauses (see PHP_CHUNKS_QUERY).
+        """
+        # The regexes below run on the raw source; only what they match is decoded
         dependencies = []
-        # Method 1: Look for namespace_use_declaration nodes
-        use_declarations = self._query_nodes(root_node, "namespace_use_declaration")
-        for use_decl in use_declarations:
-            # Get the use clause
-            use_clauses = self._query_nodes(use_decl, "namespace_use_clause")
-            for clause in use_clauses:
-                qualified_name = self._query_nodes(clause, "qualified_name")
-                if qualified_name:
-                    dep = self._get_node_text(qualified_name[0], content)
-                    if dep:
-                        dependencies.append(dep)
-    
+        # Method 1: The names imported by the namespace_use_clause nodes
+        for name_node in sorted(use_names, key=lambda n: n.start_byte):
+            dep = self._get_node_text(name_node, source)
+            if dep:
+                dependencies.append(dep)
+
         # Method 2: Fallback - regex parsing for use statements
         if not dependencies:
-            import re
-            use_patterns = [
-                r'use\s+([\\A-Za-z0-9_]+(?:\\[A-Za-z0-9_]+)*)\s*;',  # Standard use
-                r'use\s+([\\A-Za-z0-9_]+(?:\\[A-Za-z0-9_]+)*)\s+as\s+[A-Za-z0-9_]+\s*;',  # Use with alias
-                r'use\s+function\s+([\\A-Za-z0-9_]+(?:\\[A-Za-z0-9_]+)*)\s*;',  # Use function
-                r'use\s+const\s+([\\A-Za-z0-9_]+(?:\\[A-Za-z0-9_]+)*)\s*;',  # Use const
-            ]
-            
-            for pattern in use_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                dependencies.extend(matches)
-            
-        # Method 3: Additional Laravel-specific patterns
-        laravel_patterns = [
-            r'new\s+([A-Z][A-Za-z0-9_]*)',  # new ClassName()
-            r'::class',  # SomeClass::class
-            r'@extends\([\'"]([^\'"]+)[\'"]\)',  # Blade extends
-            r'@include\([\'"]([^\'"]+)[\'"]\)',  # Blade includes
-        ]   
-        import re
-        
-        for pattern in laravel_patterns:
-            matches = re.findall(pattern, content)
-            dependencies.extend(matches)
+            dependencies.extend(match.decode('utf-8', errors='replace') for match in _USE_STATEMENT_RE.findall(source))
 
-        # Clean up dependencies
-        cleaned_deps = []
-        for dep in dependencies:
-            dep = dep.strip().strip('\\')
-            if dep and dep not in cleaned_deps:
-                cleaned_deps.append(dep)
+        # Method 3: Additional Laravel-specific patterns
+        for pattern in _LARAVEL_DEPENDENCY_PATTERNS:
+            dependencies.extend(match.decode('utf-8', errors='replace') for match in pattern.findall(source))
 
-        return cleaned_deps
+        # Clean up dependencies, dropping duplicates (first occurrence kept) in linear time
+        cleaned_deps = (dep.strip().strip('\\') for dep in dependencies)
+        return list(dict.fromkeys(dep for dep in cleaned_deps if dep))
 
 
-    def _extract_internal_method_calls(self, method_node: Node, source_code: str) -> List[str]:
+    def _extract_internal_method_calls(self, method_node: Node, source_code: bytes) -> List[str]:
         """Extracts internal method calls (e.g., $this->foo(), self::bar()) from a method body."""
         internal_calls = []
         # Method body is typically a 'compound_statement' node
@@ -474,75 +749,79 @@ class LaravelProcessor:
                     # We keep the full scope_text::method_name_text format
                     internal_calls.append(f"{scope_text}::{method_name_text}")
         
-        return list(set(internal_calls)) # Remove duplicates
+        return list(dict.fromkeys(internal_calls)) # Remove duplicates, keeping the order they appear in
 
-    def _find_route_definitions(self, root_node: Node, content: str) -> List[Dict]:
+    def _find_route_definitions(self, root_node: Node, source: bytes) -> List[Dict]:
         """Find Route:: method calls"""
         routes = []
-
-        # This is simplified - you'd want more sophisticated parsing
-        # Look for method calls on "Route"
-        method_calls = self._query_nodes(root_node, "member_call_expression")
-
-        for call in method_calls:
-            call_text = self._get_node_text(call, content)
-            if "Route::" in call_text:
-                routes.append({
-                    'start_line': call.start_point[0] + 1,
-                    'end_line': call.end_point[0] + 1,
-                    'content': call_text,
-                    'metadata': {'route_definition': True}
-                })
+        seen = set()
+
+        # Only Route::x(...) calls are matched, so no other call in the file is turned into text
+        route_calls = QueryCursor(_ROUTE_CALLS_QUERY).captures(root_node).get("call", [])
+
+        for call in sorted(route_calls, key=lambda n: n.start_byte):
+            # Take the whole fluent chain, e.g. Route::get(...)->name(...)->middleware(...)
+            definition = call
+            while (
+                definition.parent is not None
+                and definition.parent.type == "member_call_expression"
+                and definition.parent.child_by_field_name("object") == definition
+            ):
+                definition = definition.parent
+            if definition.id in seen:
+                continue
+            seen.add(definition.id)
+            routes.append({
+                'start_line': definition.start_point[0] + 1,
+                'end_line': definition.end_point[0] + 1,
+                'content': self._get_node_text(definition, source),
+                'metadata': {'route_definition': True}
+            })
 
         return routes
 
-    def _extract_blade_metadata(self, content: str) -> Dict[str, Any]:
-        """Extract metadata from Blade templates"""
-        metadata = {}
-
-        # Count Blade directives
-        blade_directives = ['@extends', '@section', '@yield', '@include', '@component']
-        for directive in blade_directives:
-            count = content.count(directive)
-            if count > 0:
-                metadata[directive.replace('@', '')] = count
-
-        return metadata
-
-    def _extract_blade_dependencies(self, content: str) -> List[str]:
-        """Extract Blade template dependencies"""
-        dependencies = []
-
-        # Look for @extends, @include, etc.
-        import re
-
-        extends_matches = re.findall(r"@extends\(['\"](.+?)['\"]\)", content)
-        include_matches = re.findall(r"@include\(['\"](.+?)['\"]\)", content)
-
-        dependencies.extend(extends_matches)
-        dependencies.extend(include_matches)
-
-        return dependencies
+    def _extract_blade_metadata_and_dependencies(self, content: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Count the Blade directives of a template and collect the views it extends and
+        includes, in a single scan of the template.
+        """
+        counts = dict.fromkeys(BLADE_DIRECTIVES, 0)
+        extends, includes = [], []
+        for match in _BLADE_DIRECTIVE_RE.finditer(content):
+            directive, view = match.groups()
+            counts[directive] += 1
+            if view is None:
+                continue
+            if directive == "extends":
+                extends.append(view)
+            elif directive == "include":
+                includes.append(view)
+
+        metadata = {directive: count for directive, count in counts.items() if count > 0}
+        return metadata, extends + includes
 
     def export_chunks(self, output_file: str):
         """Export chunks to JSON file"""
-        chunks_data = [asdict(chunk) for chunk in self.chunks]
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(chunks_data, f, indent=2, ensure_ascii=False)
+        # Written chunk by chunk, so no second copy of every chunk is held at once. The adapter
+        # serializes straight from the model with pydantic-core's schema-specific serializer
+        # (no intermediate dict) to UTF-8 bytes without ASCII escaping, like ensure_ascii=False
+        with open(output_file, 'wb') as f:
+            f.write(b"[")
+            for i, chunk in enumerate(self.chunks):
+                f.write(b",\n" if i else b"\n")
+                f.write(_CODE_CHUNK_ADAPTER.dump_json(chunk, indent=2))
+            f.write(b"\n]" if self.chunks else b"]")
 
     def get_chunks_by_type(self, chunk_type: str) -> List[CodeChunk]:
         """Get all chunks of a specific type"""
-        return [chunk for chunk in self.chunks if chunk.type == chunk_type]
+        return list(self._chunks_by_type.get(chunk_type, ()))
 
     def get_chunk_statistics(self) -> Dict[str, Any]:
         """Get statistics about the analyzed codebase"""
         stats = {}
 
         # Count by type
-        type_counts = {}
-        for chunk in self.chunks:
-            type_counts[chunk.type] = type_counts.get(chunk.type, 0) + 1
+        type_counts = {chunk_type: len(chunks) for chunk_type, chunks in self._chunks_by_type.items()}
 
         stats['chunk_types'] = type_counts
         stats['total_chunks'] = len(self.chunks)
@@ -552,4 +831,116 @@ class LaravelProcessor:
         if chunk_sizes:
             stats['average_chunk_size'] = sum(chunk_sizes) / len(chunk_sizes)
 
-        return stats
\ No newline at end of file
+        return stats
+
+
+def _read_and_hash(file_path: Path) -> Tuple[bytes, bytes]:
+    """Reads a file and returns its content with its SHA-256 digest (the parse cache key)"""
+    content_bytes = file_path.read_bytes()
+    return content_bytes, hashlib.sha256(content_bytes).digest()
+
+
+def _hash_file(file_path: Path) -> bytes:
+    """
+    Returns the SHA-256 digest of a file without reading it into memory: the file is
+    memory-mapped and hashed straight from the page cache.
+    """
+    with open(file_path, "rb") as f:
+        # mmap cannot map an empty file
+        if not os.fstat(f.fileno()).st_size:
+            return hashlib.sha256(b"").digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).digest()
+
+
+def _iter_files(root: Path, suffix: str, recursive: bool = True) -> Iterator[Path]:
+    """
+    Yields the files under `root` whose name ends with `suffix`, skipping EXCLUDED_DIRS.
+
+    Walks with os.scandir, whose entries carry their file type, so no extra stat call is
+    made per entry and no Path is built for the entries that are not yielded.
+    """
+    pending = [str(root)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in EXCLUDED_DIRS:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(suffix) and entry.is_file():
+                        yield Path(entry.path)
+        except OSError as e:
+            LOGGER.warning(f"Could not list directory: {e}")
+
+
+def _enclosing_class(node: Node) -> Optional[Node]:
+    """Returns the class_declaration a node is nested in, if any"""
+    parent = node.parent
+    while parent is not None and parent.type != "class_declaration":
+        parent = parent.parent
+    return parent
+
+
+def _init_parse_worker():
+    global _WORKER_PROCESSOR
+    # Workers only parse; the parent process reads and writes the real parse cache
+    _WORKER_PROCESSOR = LaravelProcessor(parse_cache=ParseCache(":memory:"))
+
+
+def _parse_file_in_worker(file_path: Path, kind: str) -> Tuple[bytes, List[CodeChunk]]:
+    # Trees cannot be sent back, so keeping them in the worker would be wasted memory
+    return _WORKER_PROCESSOR._parse_file(file_path, kind, incremental=False)
+
+
+def _edit_between(old: bytes, new: bytes) -> Dict[str, Any]:
+    """
+    Describes the change from `old` to `new` as a single Tree.edit() range: the bytes
+    between their common prefix and common suffix.
+    """
+    start = _common_prefix_length(old, new)
+    # The suffix may not overlap the prefix in either source
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - start)
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    return {
+        "start_byte": start,
+        "old_end_byte": old_end,
+        "new_end_byte": new_end,
+        "start_point": _point_at(old, start),
+        "old_end_point": _point_at(old, old_end),
+        "new_end_point": _point_at(new, new_end),
+    }
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    """Length of the common prefix, found by binary search over C-level slice comparisons"""
+    a_view, b_view = memoryview(a), memoryview(b)
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a_view[:mid] == b_view[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common suffix, capped at `limit`"""
+    a_view, b_view = memoryview(a), memoryview(b)
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a_view[len(a) - mid:] == b_view[len(b) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point_at(source: bytes, offset: int) -> Tuple[int, int]:
+    """The (row, column) tree-sitter point of a byte offset; the column is in bytes"""
+    row = source.count(b"\n", 0, offset)
+    column = offset - (source.rfind(b"\n", 0, offset) + 1)
+    return row, column
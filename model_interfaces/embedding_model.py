@@ -1,6 +1,7 @@
 from sentence_transformers import SentenceTransformer
 from typing import List
 import logging
+import numpy as np
 from utils.logger import LOGGER
 
 import torch
@@ -65,8 +66,9 @@ class EmbeddingModel:
             LOGGER.info(f"Generating embeddings for {len(text_chunks)} chunks...")
             embeddings = self.model.encode(text_chunks, show_progress_bar=True)
             LOGGER.info("Embeddings generated successfully.")
-            # Convert numpy arrays to lists of floats if necessary for storage/serialization
-            return [embedding.tolist() for embedding in embeddings]
+            # Qdrant stores float32, so the float16 model output is widened to one contiguous
+            # float32 matrix and converted to lists in a single call instead of row by row
+            return np.ascontiguousarray(embeddings, dtype=np.float32).tolist()
         except Exception as e:
             LOGGER.error(f"Error during embedding generation: {e}")
             return [] # Or re-raise, depending on desired error handling
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Any, Dict, List
 from fastapi import HTTPException, UploadFile # Keep HTTPException if used elsewhere, UploadFile is used
 
-from db_connection.qdrant import QdrantDBManager, COLLECTION_NAME 
+from db_connection.qdrant import COLLECTION_NAME, get_manager
 from dto.value_objects import ChunkResponse, CodeChunk, QueryResponse, UserQueryAnalysisType, LLMQueryResponse, CodeReference
 from langugae_processors.php_processor import LaravelProcessor 
 from model_interfaces.embedding_model import EmbeddingModel
@@ -31,7 +31,7 @@ class ChatAssistantService():
     """
     def __init__(self):
         self.embedding_model = EmbeddingModel()
-        self.vector_store = QdrantDBManager()
+        self.vector_store = get_manager()
         try:
             self.llm_model = GeminiModel()
         except Exception as e: 
@@ -65,7 +65,8 @@ class ChatAssistantService():
         # self.lang_processor = LaravelProcessor(project_path)
         # chunks = self.lang_processor.chunk_codebase()
 
-        self.php_processor = LaravelProcessor()
+        # Reused, so its parse cache (and SQLite connection) is shared by every upload
+        self.php_processor.chunks = []
         code_chunks: List[CodeChunk] = self.php_processor.analyze_codebase(project_path)
         
         if not code_chunks:
@@ -82,7 +83,9 @@ class ChatAssistantService():
 
         # Use the full chunk data (as dictionaries) for payloads in Qdrant
         payloads = [chunk.model_dump() for chunk in code_chunks] # Use .model_dump() for Pydantic models
-        success = self.vector_store.save_embeddings(embeddings, payloads)
+        # Indexing is paused while the whole codebase is uploaded and built once afterwards
+        async with self.vector_store.bulk_load_async():
+            success = await self.vector_store.save_embeddings_async(embeddings, payloads)
 
         if not success:
             LOGGER.info("Failed to save embeddings to vector store.")
@@ -350,18 +353,12 @@ class ChatAssistantService():
                 LOGGER.error(f"Embedding failed or mismatch. Expected {len(new_chunks)} embeddings, got {len(embeddings) if embeddings else 0}.")
                 return {"status": "error", "message": "Failed to generate embeddings for new chunks"}
 
-            # Step 3: Delete old chunks from Qdrant
-            success = self.vector_store.delete_chunks_by_file_path(file_path)
-            if not success:
-                LOGGER.error(f"Failed to delete old chunks for {file_path} from Qdrant.")
-                return {"status": "error", "message": f"Failed to delete old chunks for {file_path} from Qdrant"}
-
-            # Step 4: Upsert new chunks to Qdrant
+            # Step 3: Replace the old chunks with the new ones in Qdrant (one atomic request)
             payloads = [chunk.model_dump() for chunk in new_chunks]
-            success = self.vector_store.save_embeddings(embeddings, payloads)
+            success = self.vector_store.reindex_file(file_path, embeddings, payloads)
             if not success:
-                LOGGER.error(f"Failed to upsert new chunks for {file_path} to Qdrant.")
-                return {"status": "error", "message": f"Failed to upsert new chunks for {file_path} to Qdrant"}
+                LOGGER.error(f"Failed to replace chunks for {file_path} in Qdrant.")
+                return {"status": "error", "message": f"Failed to replace chunks for {file_path} in Qdrant"}
 
             LOGGER.info(f"Successfully updated Qdrant with {len(new_chunks)} new chunks for {file_path}")
             return {"status": "success", "message": f"Successfully updated Qdrant with {len(new_chunks)} new chunks for {file_path}"}
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+try:
+    from langugae_processors.laravel_processor import LaravelProcessor
+except ImportError as e: # tree_sitter / tree_sitter_php not installed
+    raise unittest.SkipTest(f"laravel_processor dependencies unavailable: {e}")
+
+
+class ExtractDefinitionsTest(unittest.TestCase):
+    def setUp(self):
+        self.processor = LaravelProcessor(".")
+        if self.processor.parser is None:
+            self.skipTest("tree-sitter PHP parser unavailable")
+
+    def chunk(self, source: bytes):
+        with tempfile.NamedTemporaryFile(suffix=".php", delete=False) as f:
+            f.write(source)
+        self.addCleanup(os.remove, f.name)
+        return [chunk["metadata"] for chunk in self.processor.chunk_using_treesitter(f.name)]
+
+    def test_statement_namespace_applies_to_following_classes(self):
+        metadata = self.chunk(b"""<?php
+namespace App\\Models;
+
+class Leave
+{
+    public function approve() {}
+}
+
+class Holiday
+{
+    public function dates() {}
+}
+""")
+        self.assertEqual([m["full_name"] for m in metadata], ["App\\Models\\Leave::approve", "App\\Models\\Holiday::dates"])
+        self.assertEqual({m["namespace"] for m in metadata}, {"App\\Models"})
+        self.assertEqual([m["class_name"] for m in metadata], ["Leave", "Holiday"])
+
+    def test_next_namespace_replaces_the_previous_one(self):
+        metadata = self.chunk(b"""<?php
+namespace App\\Models;
+
+class Leave
+{
+    public function approve() {}
+}
+
+namespace App\\Http;
+
+function helper() {}
+""")
+        self.assertEqual([m["full_name"] for m in metadata], ["App\\Models\\Leave::approve", "App\\Http\\helper"])
+
+    def test_braced_namespace_and_nested_functions(self):
+        metadata = self.chunk(b"""<?php
+namespace App {
+    class Leave
+    {
+        public function approve()
+        {
+            function inner() {}
+        }
+    }
+}
+
+namespace {
+    function global_helper() {}
+}
+""")
+        # Definitions inside an emitted function are part of its chunk, not chunks of their own
+        self.assertEqual([m["function_name"] for m in metadata], ["approve", "global_helper"])
+        self.assertEqual([m["full_name"] for m in metadata], ["App\\Leave::approve", "global_helper"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+try:
+    from dto.value_objects import CodeChunk
+    from langugae_processors.parse_cache import ParseCache
+except ImportError as e: # pydantic not installed
+    raise unittest.SkipTest(f"parse_cache dependencies unavailable: {e}")
+
+
+def make_chunk(name: str) -> CodeChunk:
+    return CodeChunk(
+        type="controller",
+        name=name,
+        file_path="app/Http/Controllers/LeaveController.php",
+        start_line=1,
+        end_line=10,
+        content="class LeaveController {}",
+        metadata={"method_count": 0},
+        import_dependencies=["App\\Models\\Leave"],
+        method_dependencies=[],
+    )
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        self.addCleanup(os.remove, self.db_path)
+
+    def open_cache(self, version: int = 1) -> ParseCache:
+        cache = ParseCache(self.db_path, version=version)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_round_trip(self):
+        cache = self.open_cache()
+        chunks = [make_chunk("LeaveController")]
+        cache.put("a.php", "controller", b"digest", chunks)
+        self.assertEqual(cache.get("a.php", "controller", b"digest"), chunks)
+
+    def test_miss_on_other_content_kind_or_path(self):
+        cache = self.open_cache()
+        cache.put("a.php", "controller", b"digest", [make_chunk("A")])
+        self.assertIsNone(cache.get("a.php", "controller", b"changed"))
+        self.assertIsNone(cache.get("a.php", "model", b"digest"))
+        self.assertIsNone(cache.get("b.php", "controller", b"digest"))
+
+    def test_put_replaces_previous_content(self):
+        cache = self.open_cache()
+        cache.put("a.php", "controller", b"old", [make_chunk("Old")])
+        cache.put("a.php", "controller", b"new", [make_chunk("New")])
+        self.assertIsNone(cache.get("a.php", "controller", b"old"))
+        self.assertEqual(cache.get("a.php", "controller", b"new")[0].name, "New")
+
+    def test_persists_across_connections(self):
+        cache = ParseCache(self.db_path, version=1)
+        with cache.batch():
+            cache.put("a.php", "controller", b"digest", [make_chunk("A")])
+        cache.close()
+        self.assertEqual(self.open_cache().get("a.php", "controller", b"digest")[0].name, "A")
+
+    def test_other_extractor_version_is_a_miss_and_is_dropped(self):
+        cache = ParseCache(self.db_path, version=1)
+        cache.put("a.php", "controller", b"digest", [make_chunk("A")])
+        cache.close()
+        upgraded = self.open_cache(version=2)
+        self.assertIsNone(upgraded.get("a.php", "controller", b"digest"))
+        tables = {name for (name,) in sqlite3.connect(self.db_path).execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertEqual(tables, {"parse_cache_v2"})
+
+    def test_unreadable_entry_is_a_miss(self):
+        cache = self.open_cache()
+        with cache._lock:
+            cache._conn.execute(
+                f"INSERT INTO {cache._table} (path, kind, sha256, chunks) VALUES (?, ?, ?, ?)",
+                ("a.php", "controller", b"digest", b"not a pickle")
+            )
+        self.assertIsNone(cache.get("a.php", "controller", b"digest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+
+try:
+    from tree_sitter import Parser
+    from langugae_processors.php_processor import (
+        PHP_LANGUAGE,
+        _common_prefix_length,
+        _common_suffix_length,
+        _edit_between,
+        _point_at,
+    )
+except ImportError as e: # tree_sitter / tree_sitter_php / pydantic not installed
+    raise unittest.SkipTest(f"php_processor dependencies unavailable: {e}")
+
+
+SOURCE = b"""<?php
+
+namespace App\\Http\\Controllers;
+
+class LeaveController extends Controller
+{
+    public function index()
+    {
+        return Leave::all();
+    }
+}
+"""
+
+
+def _sexp(node) -> str:
+    """The node's subtree as (type [start, end] children...), including byte ranges"""
+    children = " ".join(_sexp(child) for child in node.children)
+    return f"({node.type} [{node.start_byte}, {node.end_byte}] {node.start_point} {node.end_point} {children})"
+
+
+class EditBetweenTest(unittest.TestCase):
+    def assertValidEdit(self, old: bytes, new: bytes):
+        edit = _edit_between(old, new)
+        start, old_end, new_end = edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]
+        # The range is ordered, inside both sources and surrounded by unchanged bytes
+        self.assertLessEqual(0, start)
+        self.assertLessEqual(start, old_end)
+        self.assertLessEqual(start, new_end)
+        self.assertLessEqual(old_end, len(old))
+        self.assertLessEqual(new_end, len(new))
+        self.assertEqual(old[:start], new[:start])
+        self.assertEqual(old[old_end:], new[new_end:])
+        # Replacing the old range with the new one turns old into new
+        self.assertEqual(old[:start] + new[start:new_end] + old[old_end:], new)
+        self.assertEqual(edit["start_point"], _point_at(old, start))
+        self.assertEqual(edit["old_end_point"], _point_at(old, old_end))
+        self.assertEqual(edit["new_end_point"], _point_at(new, new_end))
+        return edit
+
+    def test_insert(self):
+        edit = self.assertValidEdit(b"abcdef", b"abcXYdef")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (3, 3, 5))
+
+    def test_delete(self):
+        edit = self.assertValidEdit(b"abcXYdef", b"abcdef")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (3, 5, 3))
+
+    def test_replace(self):
+        edit = self.assertValidEdit(b"abcXdef", b"abcYZdef")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (3, 4, 5))
+
+    def test_multi_line_edit(self):
+        old = b"line1\nline2\nline3\n"
+        new = b"line1\nnew a\nnew b\nline2\nline3\n"
+        edit = self.assertValidEdit(old, new)
+        self.assertEqual(edit["start_point"], (1, 0))
+        self.assertEqual(edit["old_end_point"], (1, 0))
+        self.assertEqual(edit["new_end_point"], (3, 0))
+
+    def test_edit_at_start(self):
+        edit = self.assertValidEdit(b"abc", b"Xabc")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (0, 0, 1))
+        self.assertEqual(edit["start_point"], (0, 0))
+
+    def test_edit_at_end(self):
+        edit = self.assertValidEdit(b"abc\n", b"abc\nX")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (4, 4, 5))
+        self.assertEqual(edit["new_end_point"], (1, 1))
+
+    def test_prefix_and_suffix_overlap(self):
+        # "aa" -> "aaa": the common prefix (2) and suffix (2) would overlap; the suffix is
+        # capped so the range stays ordered
+        edit = self.assertValidEdit(b"aa", b"aaa")
+        self.assertEqual((edit["start_byte"], edit["old_end_byte"], edit["new_end_byte"]), (2, 2, 3))
+        self.assertValidEdit(b"abab", b"ab")
+        self.assertValidEdit(b"x\nx\n", b"x\nx\nx\n")
+
+    def test_identical_and_empty(self):
+        edit = self.assertValidEdit(b"same", b"same")
+        self.assertEqual(edit["start_byte"], edit["old_end_byte"])
+        self.assertEqual(edit["start_byte"], edit["new_end_byte"])
+        self.assertValidEdit(b"", b"abc")
+        self.assertValidEdit(b"abc", b"")
+
+    def test_common_lengths(self):
+        self.assertEqual(_common_prefix_length(b"abcd", b"abXd"), 2)
+        self.assertEqual(_common_prefix_length(b"ab", b"abcd"), 2)
+        self.assertEqual(_common_suffix_length(b"abcd", b"aXcd", 4), 2)
+        self.assertEqual(_common_suffix_length(b"abcd", b"abcd", 1), 1)
+
+    def test_point_at(self):
+        source = b"ab\ncd\n\nef"
+        self.assertEqual(_point_at(source, 0), (0, 0))
+        self.assertEqual(_point_at(source, 2), (0, 2))
+        self.assertEqual(_point_at(source, 3), (1, 0))
+        self.assertEqual(_point_at(source, 7), (3, 0))
+        self.assertEqual(_point_at(source, len(source)), (3, 2))
+        # Columns are counted in bytes, as tree-sitter does
+        self.assertEqual(_point_at("é\nx".encode("utf-8"), 2), (0, 2))
+
+
+class IncrementalParseTest(unittest.TestCase):
+    EDITS = [
+        # Insert a method
+        SOURCE.replace(b"    }\n}", b"    }\n\n    public function show()\n    {\n        return 1;\n    }\n}"),
+        # Delete the return statement
+        SOURCE.replace(b"        return Leave::all();\n", b""),
+        # Rename (replace) within a line
+        SOURCE.replace(b"index", b"listAll"),
+        # Edits at the start and end of the file
+        b"\n" + SOURCE,
+        SOURCE + b"// trailing comment\n",
+        # A multi-byte character before the change shifts byte columns
+        SOURCE.replace(b"return Leave::all();", "return 'é' . Leave::all();".encode("utf-8")),
+    ]
+
+    def test_incremental_tree_matches_fresh_parse(self):
+        for new in self.EDITS:
+            with self.subTest(new=new):
+                parser = Parser(PHP_LANGUAGE)
+                old_tree = parser.parse(SOURCE)
+                old_tree.edit(**_edit_between(SOURCE, new))
+                incremental = parser.parse(new, old_tree=old_tree)
+                fresh = Parser(PHP_LANGUAGE).parse(new)
+                self.assertEqual(_sexp(incremental.root_node), _sexp(fresh.root_node))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    from langugae_processors import php_processor
+    from langugae_processors.parse_cache import ParseCache
+    from langugae_processors.php_processor import LaravelProcessor
+except ImportError as e: # tree_sitter / tree_sitter_php / pydantic not installed
+    raise unittest.SkipTest(f"php_processor dependencies unavailable: {e}")
+
+
+SAMPLE_APP = Path(__file__).resolve().parent.parent / "TEST" / "php"
+
+MIDDLEWARE = b"""<?php
+
+namespace App\\Http\\Middleware;
+
+class EnsureManager
+{
+    public function handle($request, $next)
+    {
+        return $next($request);
+    }
+}
+"""
+
+
+def _order(chunks):
+    return [(chunk.type, chunk.name, chunk.file_path) for chunk in chunks]
+
+
+class ChunkOrderTest(unittest.TestCase):
+    """analyze_codebase defers and batches the parsing, but must add chunks in walk order"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        shutil.copytree(SAMPLE_APP, self.root, dirs_exist_ok=True)
+        # Walked after the views, so the templates sit between PHP files
+        (self.root / "app/Http/Middleware").mkdir(parents=True)
+        (self.root / "app/Http/Middleware/EnsureManager.php").write_bytes(MIDDLEWARE)
+        self.cache = ParseCache(":memory:")
+        self.addCleanup(self.cache.close)
+
+    def sequential_order(self):
+        processor = LaravelProcessor(parse_cache=ParseCache(":memory:"))
+        # Without analyze_codebase's deferral every file is parsed as the walk reaches it
+        processor._analyze_directories(self.root)
+        return _order(processor.chunks)
+
+    def test_matches_sequential_walk(self):
+        expected = self.sequential_order()
+        types = [chunk_type for chunk_type, _, _ in expected]
+        self.assertLess(types.index("route"), types.index("blade_template"))
+        self.assertLess(types.index("blade_template"), types.index("middleware"))
+
+        processor = LaravelProcessor(parse_cache=self.cache)
+        self.assertEqual(_order(processor.analyze_codebase(str(self.root))), expected)
+        # Served from the parse cache and the Blade stat cache this time
+        processor.chunks = []
+        self.assertEqual(_order(processor.analyze_codebase(str(self.root))), expected)
+
+    def test_matches_sequential_walk_with_process_pool(self):
+        expected = self.sequential_order()
+        with mock.patch.object(php_processor, "PARALLEL_MIN_FILES", 1):
+            chunks = LaravelProcessor(parse_cache=self.cache).analyze_codebase(str(self.root))
+        self.assertEqual(_order(chunks), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
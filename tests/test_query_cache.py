@@ -0,0 +1,227 @@
+import unittest
+
+try:
+    import numpy as np
+    from qdrant_client import QdrantClient
+    from db_connection.query_cache import QueryCacheStore, QueryVectorCache, normalize
+except ImportError as e: # numpy / qdrant_client not installed
+    raise unittest.SkipTest(f"query_cache dependencies unavailable: {e}")
+
+
+def unit(*components) -> "np.ndarray":
+    return normalize(np.array(components, dtype=np.float32))
+
+
+def at_similarity(base: "np.ndarray", other: "np.ndarray", similarity: float) -> "np.ndarray":
+    """A unit vector with the given cosine similarity to `base`, in the plane of `base` and `other`"""
+    return normalize(similarity * base + np.sqrt(1 - similarity ** 2) * other)
+
+
+class FakeStore:
+    """In-memory stand-in for QueryCacheStore"""
+
+    def __init__(self):
+        self.current = "g1"
+        self.saved = {}
+        self.deleted = []
+        self.generation_reads = 0
+
+    def generation(self):
+        self.generation_reads += 1
+        return self.current
+
+    def new_generation(self):
+        self.current = f"g{int(self.current[1:]) + 1}"
+        return self.current
+
+    def load(self, limit, generation):
+        return []
+
+    def save(self, key, entry, generation):
+        self.saved[entry.entry_id] = (key, entry, generation)
+
+    def delete(self, entry_ids):
+        self.deleted.extend(entry_ids)
+
+    def clear(self):
+        self.saved.clear()
+        return self.new_generation()
+
+
+def raise_connection_error():
+    raise ConnectionError("Qdrant unreachable")
+
+
+X, Y, Z = unit(1, 0, 0, 0), unit(0, 1, 0, 0), unit(0, 0, 1, 0)
+
+
+class QueryVectorCacheTest(unittest.TestCase):
+    def make_cache(self, **kwargs) -> QueryVectorCache:
+        return QueryVectorCache(dimension=4, threshold=0.97, merge_threshold=0.90, **kwargs)
+
+    def test_hit_and_miss(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, [1, 2], [{"a": 1}, {"a": 2}])
+        self.assertEqual(cache.get(at_similarity(X, Y, 0.98), 5, None).point_ids, [1, 2])
+        self.assertIsNone(cache.get(at_similarity(X, Y, 0.95), 5, None))
+        self.assertIsNone(cache.get(Y, 5, None))
+
+    def test_hit_requires_compatible_search(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, [1], [{}])
+        # Fewer results can be cut from a larger search; more cannot
+        self.assertIsNotNone(cache.get(X, 3, None))
+        self.assertIsNone(cache.get(X, 8, None))
+        self.assertIsNone(cache.get(X, 5, 0.5))
+
+    def test_merge_keeps_results_of_query_closest_to_centroid(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, ["x"], [{"q": "x"}])
+        # Below the hit threshold but within the merge threshold: folded into X's centroid
+        near = at_similarity(X, Y, 0.93)
+        cache.put(near, 5, None, ["near"], [{"q": "near"}])
+        self.assertEqual(cache._size, 1)
+        self.assertEqual(cache._counts[0], 2)
+        # The key moved, but the results are still X's (the new query is no closer to it)
+        self.assertFalse(np.allclose(cache._keys[0], X))
+        self.assertEqual(cache.get(X, 5, None).point_ids, ["x"])
+
+    def test_merge_takes_results_of_closer_query(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, ["x"], [{"q": "x"}])
+        cache.put(at_similarity(X, Y, 0.93), 5, None, ["near"], [{"q": "near"}])
+        centroid = cache._keys[0].copy()
+        # A query right on the centroid is closer to it than X
+        cache.put(centroid, 5, None, ["center"], [{"q": "center"}])
+        self.assertEqual(cache._size, 1)
+        self.assertEqual(cache.get(centroid, 5, None).point_ids, ["center"])
+
+    def test_no_merge_across_search_parameters(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, ["x"], [{}])
+        cache.put(at_similarity(X, Y, 0.93), 8, None, ["other"], [{}])
+        self.assertEqual(cache._size, 2)
+
+    def test_restored_entry_gets_its_payloads(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, ["x"], [{"q": "x"}])
+        entry = cache._entries[0]
+        cache._entries[0] = entry._replace(payloads=None)
+        # The same results again, from a query that would not take over the entry
+        cache.put(at_similarity(X, Y, 0.98), 5, None, ["x"], [{"q": "x"}])
+        self.assertEqual(cache.get(X, 5, None).payloads, [{"q": "x"}])
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryVectorCache(dimension=4, capacity=2, threshold=0.97, merge_threshold=0.97)
+        cache.put(X, 5, None, ["x"], [{}])
+        cache.put(Y, 5, None, ["y"], [{}])
+        cache.get(X, 5, None) # X is now more recently used than Y
+        cache.put(Z, 5, None, ["z"], [{}])
+        self.assertIsNotNone(cache.get(X, 5, None))
+        self.assertIsNone(cache.get(Y, 5, None))
+        self.assertIsNotNone(cache.get(Z, 5, None))
+
+    def test_clear(self):
+        cache = self.make_cache()
+        cache.put(X, 5, None, ["x"], [{}])
+        cache.clear()
+        self.assertIsNone(cache.get(X, 5, None))
+
+    def test_persists_with_generation_and_deletes_evicted(self):
+        store = FakeStore()
+        cache = QueryVectorCache(dimension=4, capacity=1, store=store)
+        cache.warm_start()
+        cache.put(X, 5, None, ["x"], [{}])
+        (first_id, (_, _, generation)), = store.saved.items()
+        self.assertEqual(generation, "g1")
+        cache.put(Y, 5, None, ["y"], [{}])
+        self.assertEqual(store.deleted, [first_id])
+
+    def test_entries_dropped_when_another_process_clears(self):
+        store = FakeStore()
+        cache = self.make_cache(store=store, generation_ttl=0)
+        cache.warm_start()
+        cache.put(X, 5, None, ["x"], [{}])
+        self.assertIsNotNone(cache.get(X, 5, None))
+        # Another process sharing the store cleared the cache
+        store.new_generation()
+        self.assertIsNone(cache.get(X, 5, None))
+        # Entries cached from now on belong to the new generation
+        cache.put(X, 5, None, ["x2"], [{}])
+        self.assertEqual(cache.get(X, 5, None).point_ids, ["x2"])
+
+    def test_unreadable_generation_keeps_entries(self):
+        store = FakeStore()
+        cache = self.make_cache(store=store, generation_ttl=0)
+        cache.warm_start()
+        cache.put(X, 5, None, ["x"], [{}])
+        store.generation = raise_connection_error
+        self.assertIsNotNone(cache.get(X, 5, None))
+
+    def test_generation_read_at_most_once_per_ttl(self):
+        store = FakeStore()
+        cache = self.make_cache(store=store, generation_ttl=60)
+        cache.warm_start()
+        cache.put(X, 5, None, ["x"], [{}])
+        for _ in range(10):
+            self.assertIsNotNone(cache.get(X, 5, None))
+        # Only warm_start went to the store; a clear elsewhere is seen once the read is stale
+        self.assertEqual(store.generation_reads, 1)
+        store.new_generation()
+        self.assertIsNotNone(cache.get(X, 5, None))
+        cache._generation_checked_at -= 60
+        self.assertIsNone(cache.get(X, 5, None))
+        self.assertEqual(store.generation_reads, 2)
+
+    def test_warm_start_keeps_generation_when_unreadable(self):
+        store = FakeStore()
+        store.generation = raise_connection_error
+        cache = self.make_cache(store=store)
+        cache.warm_start()
+        # A failed read is not a missing generation; the other processes' caches stay valid
+        self.assertEqual(store.current, "g1")
+        self.assertIsNone(cache._generation)
+
+    def test_warm_start_creates_missing_generation(self):
+        store = FakeStore()
+        store.current = "g0"
+        store.generation = lambda: None
+        cache = self.make_cache(store=store)
+        cache.warm_start()
+        self.assertEqual(cache._generation, "g1")
+
+
+class QueryCacheStoreTest(unittest.TestCase):
+    """Runs against qdrant_client's local in-memory mode"""
+
+    def setUp(self):
+        self.client = QdrantClient(":memory:")
+
+    def make_cache(self) -> QueryVectorCache:
+        store = QueryCacheStore(self.client, "query_cache_test", 4, ttl_seconds=60)
+        cache = QueryVectorCache(dimension=4, store=store, generation_ttl=0)
+        cache.warm_start()
+        return cache
+
+    def test_generation_missing_until_first_warm_start(self):
+        store = QueryCacheStore(self.client, "query_cache_test", 4, ttl_seconds=60)
+        self.assertIsNone(store.generation())
+        self.make_cache()
+        self.assertIsNotNone(store.generation())
+
+    def test_entries_are_shared_and_invalidated_across_caches(self):
+        first = self.make_cache()
+        first.put(X, 5, None, [1, 2], [{}, {}])
+        # A second process starting up restores the entry (without its payloads)
+        second = self.make_cache()
+        restored = second.get(X, 5, None)
+        self.assertEqual(restored.point_ids, [1, 2])
+        self.assertIsNone(restored.payloads)
+        # Clearing in one process invalidates the other's in-memory entries and the store
+        first.clear()
+        self.assertIsNone(second.get(X, 5, None))
+        self.assertEqual(self.make_cache()._size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()